@@ -7,16 +7,17 @@ import subprocess
 import sys
 import os
 import threading
+import queue
 import time
-import glob
-import shutil
-from PIL import Image
+from collections import OrderedDict
 
-# -----------------------------
-# Project configuration
-# -----------------------------
-PROJECT_FOLDER_NAME = "silhouette-card-maker-1.4.0"
-PROJECT_VERSION = PROJECT_FOLDER_NAME.split("-")[-1]
+from card_maker_core import (
+    GAMES, NEAR_DUPLICATE_DISTANCE, PROJECT_VERSION, JobQueue, LogPipeline, ThumbnailDiskCache,
+    ThumbnailLoader, WorkflowEngine, describe_progress,
+)
+
+# The on-screen log keeps the last LOG_MAX_LINES lines; the log file has everything
+LOG_MAX_LINES = 5000
 
 # -----------------------------
 # CustomTkinter global styling
@@ -38,95 +39,255 @@ class CTkLabelFrame(ctk.CTkFrame):
         self.label.pack(anchor="w", padx=label_padx, pady=(label_pady, 10))
 
 
+# -----------------------------
+# Helper: virtualized thumbnail grid
+# -----------------------------
+class VirtualThumbnailGrid(ctk.CTkFrame):
+    # Only rows in view get widgets. Cells are recycled while scrolling and at
+    # most max_images CTkImages are kept alive, so cost does not grow with deck size.
+    # Tiles are keyed by image path, so items can be appended or reordered
+    # (while a download is still running) without decoding anything twice.
+    def __init__(self, master, items, loader, cell_width=236, cell_height=340,
+                 max_images=96, **kwargs):
+        super().__init__(master, **kwargs)
+        self.items = list(items)          # [(image_path, rel_path), ...]
+        self.loader = loader              # ThumbnailLoader; decoded tiles stream in
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.max_images = max_images
+        self.cols = 1
+
+        self._cells = []                  # recycled cell widgets
+        self._images = OrderedDict()      # image path -> CTkImage (LRU)
+        self._errors = {}                 # image path -> error text
+        self._signatures = {}             # image path -> (size, mtime_ns) it was decoded at
+
+        bg = self.cget("fg_color")
+        if bg == "transparent":
+            bg = self._detect_color_of_master()
+        self.canvas = tk.Canvas(self, highlightthickness=0, borderwidth=0,
+                                bg=self._apply_appearance_mode(bg))
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self._layout())
+        self.canvas.bind("<Enter>", lambda e: self._bind_wheel(True))
+        self.canvas.bind("<Leave>", lambda e: self._bind_wheel(False))
+        self.canvas.bind("<Destroy>", lambda e: self._on_destroy())
+        self.after(30, self._drain_results)
+
+    def append(self, items):
+        self.items.extend(items)
+        self._layout()
+
+    def set_items(self, items):
+        items = list(items)
+        changed = self.drop_changed()
+        if items != self.items:
+            self.items = items
+            self._layout()
+        elif changed:
+            self._refresh()
+
+    def drop_changed(self):
+        # Forgets tiles and errors of images that were rewritten or removed
+        # since they were decoded (a download still writing them); returns
+        # whether there were any
+        stale = set()
+        for path, signature in self._signatures.items():
+            if self._signature(path) != signature:
+                stale.add(path)
+        for path in stale:
+            self._signatures.pop(path, None)
+            self._images.pop(path, None)
+            self._errors.pop(path, None)
+        for cell in self._cells:
+            if cell["path"] in stale:
+                cell["path"] = None   # makes _refresh fill it again
+        return bool(stale)
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+
+    def _on_destroy(self):
+        self._bind_wheel(False)
+        self.loader.close()
+
+    def _drain_results(self):
+        if not self.winfo_exists():
+            return
+        showing = {self.items[c["index"]][0]: c for c in self._cells
+                   if c["index"] is not None and c["index"] < len(self.items)}
+        for _ in range(64):
+            try:
+                (path, signature), img, error = self.loader.results.get_nowait()
+            except queue.Empty:
+                break
+            if self._signatures.get(path) != signature:
+                continue              # the file changed after it was requested
+            if img is None:
+                self._errors[path] = error
+            else:
+                self._images[path] = ctk.CTkImage(light_image=img, dark_image=img, size=img.size)
+                while len(self._images) > self.max_images:
+                    evicted, _ = self._images.popitem(last=False)
+                    self._signatures.pop(evicted, None)
+            if path in showing:
+                self._fill_cell(showing[path], showing[path]["index"])
+        self.after(30, self._drain_results)
+
+    def _bind_wheel(self, active):
+        if active:
+            self.canvas.bind_all("<MouseWheel>", self._on_wheel)
+            self.canvas.bind_all("<Button-4>", self._on_wheel)
+            self.canvas.bind_all("<Button-5>", self._on_wheel)
+        else:
+            for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.canvas.unbind_all(seq)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            step = -1
+        elif getattr(event, "num", None) == 5:
+            step = 1
+        else:
+            step = -1 if event.delta > 0 else 1
+        self.canvas.yview_scroll(step, "units")
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._refresh()
+
+    def _layout(self):
+        width = max(self.canvas.winfo_width(), self.cell_width)
+        self.cols = max(1, width // self.cell_width)
+        rows = (len(self.items) + self.cols - 1) // self.cols
+        self.canvas.configure(scrollregion=(0, 0, width, rows * self.cell_height),
+                              yscrollincrement=self.cell_height // 4)
+        self._refresh()
+
+    def _new_cell(self):
+        frame = ctk.CTkFrame(self.canvas, corner_radius=8,
+                             width=self.cell_width - 16, height=self.cell_height - 16)
+        frame.pack_propagate(False)
+        image_label = ctk.CTkLabel(frame, text="", width=220, height=300)
+        image_label.pack(padx=6, pady=(6, 0))
+        name_label = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=11))
+        name_label.pack(pady=(0, 4))
+        window = self.canvas.create_window(0, 0, window=frame, anchor="nw")
+        cell = {"frame": frame, "image": image_label, "name": name_label,
+                "window": window, "index": None, "path": None}
+        self._cells.append(cell)
+        return cell
+
+    def _refresh(self):
+        if not self.items:
+            return
+        top = int(self.canvas.canvasy(0))
+        height = max(self.canvas.winfo_height(), self.cell_height)
+        first_row = max(0, top // self.cell_height)
+        last_row = (top + height) // self.cell_height
+        first = first_row * self.cols
+        visible = range(first, min(len(self.items), (last_row + 1) * self.cols))
+
+        by_index = {}
+        free = []
+        for cell in self._cells:
+            # A cell is reused as is only if it still shows the same image
+            if cell["index"] is not None and cell["index"] in visible and cell["index"] not in by_index \
+                    and cell["path"] == self.items[cell["index"]][0]:
+                by_index[cell["index"]] = cell
+            else:
+                free.append(cell)
+        x_offset = max(0, (self.canvas.winfo_width() - self.cols * self.cell_width) // 2)
+        for i in visible:
+            cell = by_index.get(i)
+            if cell is None:
+                cell = free.pop() if free else self._new_cell()
+                self._fill_cell(cell, i)
+            row, col = divmod(i, self.cols)
+            self.canvas.coords(cell["window"], x_offset + col * self.cell_width + 8,
+                               row * self.cell_height + 8)
+            self.canvas.itemconfigure(cell["window"], state="normal")
+        for cell in free:
+            cell["index"] = None
+            self.canvas.itemconfigure(cell["window"], state="hidden")
+
+        # Queue visible tiles last so the LIFO loader decodes them first
+        ahead = range(visible.stop, min(len(self.items), visible.stop + len(visible)))
+        wanted = [self.items[i][0] for i in list(ahead)[::-1] + list(visible)[::-1]]
+        requests = []
+        for path in wanted:
+            if path not in self._images and path not in self._errors:
+                # Keyed by the file's state, so a tile decoded from an older
+                # version of the file is recognised and dropped
+                if path not in self._signatures:
+                    self._signatures[path] = self._signature(path)
+                requests.append((path, self._signatures[path]))
+        self.loader.retain(set(requests))
+        for key in requests:
+            self.loader.request(key, key[0])
+
+    def _fill_cell(self, cell, index):
+        image_path = self.items[index][0]
+        cell["index"] = index
+        cell["path"] = image_path
+        cell["name"].configure(text=os.path.basename(image_path))
+        if image_path in self._images:
+            self._images.move_to_end(image_path)
+            cell["image"].configure(image=self._images[image_path], text="")
+        elif image_path in self._errors:
+            cell["image"].configure(image=None, text=f"Error loading image:\n{self._errors[image_path]}",
+                                    text_color="red")
+        else:
+            cell["image"].configure(image=None, text="Loading...", text_color="gray")
+
+
 # -----------------------------
 # Main GUI
 # -----------------------------
 class CardMakerGUI:
-    # Centralized game -> method mapping.
-    # Each game has a 'dir' used for plugin folder, and a set of human-friendly method labels mapping to 'source' strings.
-    GAMES = {
-        "Magic: The Gathering": {
-            "dir": "mtg",
-            "methods": {
-                "Moxfield": "moxfield",
-                "MTGA": "mtga",
-                "MTGO": "mtgo",
-                "Archidekt": "archidekt",
-                "Deckstats": "deckstats",
-                "Scryfall": "scryfall",
-            },
-        },
-        "Riftbound": {
-            "dir": "riftbound",
-            "methods": {
-                "Pixelborn": "pixelborn",
-                "TTS": "tts",
-                "Piltover": "piltover_archive",
-            },
-        },
-        "Yu-Gi-Oh!": {
-            "dir": "yugioh",
-            "methods": {
-                "YDK": "ydk",
-                "YDKE": "ydke",
-            },
-        },
-        "Lorcana": {
-            "dir": "lorcana",
-            "methods": {
-                "Dreamborn": "dreamborn",
-            },
-        },
-        "Netrunner": {
-            "dir": "netrunner",
-            "methods": {
-                "Jinteki": "jinteki",
-                "bbCode": "bbcode",
-                "Markdown(Reddit)": "markdown",
-                "Text": "text",
-                "Plain Text": "plain_text",
-            },
-        },
-        "Altered": {
-            "dir": "altered",
-            "methods": {
-                "Ajordat": "ajordat",
-            },
-        },
-    }
+    # Centralized game -> method mapping (see card_maker_core.GAMES)
+    GAMES = GAMES
 
     def __init__(self, root):
         self.root = root
         self.root.title(f"Silhouette Card Maker GUI | loaded {PROJECT_VERSION}")
         self.root.geometry("1000x900")
 
-        # Supported image extensions (Pillow capable)
-        self.supported_image_extensions = {
-            ".png",".jpg",".jpeg",".gif",".bmp",".tiff",".tif",
-            ".webp",".ico",".ppm",".pgm",".pbm",".pnm",".pcx",
-            ".dib",".eps",".ps",".pdf",".sgi",".tga",".xbm",".xpm"
-        }
-
-        # Paths (discovered later)
-        self.project_path = None
-        self.venv_path = None
-        self.decklist_path = None
-        self.front_dir = None
-        self.double_sided_dir = None
-        self.output_dir = None
-
         # State
         self.current_step = 0
         self.steps_completed = []
         self.is_running = False
 
-        # Loading animations
-        self._loading_running = False
-        self._pdf_loading_running = False
-
-        self._thumbnails_refs = []  # keep image refs alive
+        # Download / PDF progress window
+        self.task_win = None
+        # Open thumbnail preview: {"win", "grid", ...}; "downloading" while it fills in
+        self.preview = None
+
+        self.log = LogPipeline()
+
+        # Workflow logic lives in the engine; it reports back through these
+        # callbacks from worker threads, so each one hops onto the Tk thread
+        self.engine = WorkflowEngine(
+            log=self.log_message,
+            on_step=lambda index, status: self.root.after(0, lambda: self.update_step_status(index, status)),
+            on_status=lambda text: self.root.after(0, lambda: self.status_var.set(text)),
+            on_progress=lambda value: self.root.after(0, lambda: self.progress_bar.set(value)),
+            on_task_progress=lambda progress: self.root.after(0, lambda: self.update_task_window(progress)),
+            on_new_images=lambda paths: self.root.after(0, lambda: self.add_preview_images(paths)),
+        )
+        self.supported_image_extensions = self.engine.supported_image_extensions
 
         self.setup_ui()
+        self.drain_log()
         self.check_initial_state()
 
     # -------------- UI LAYOUT --------------
@@ -205,7 +366,23 @@ class CardMakerGUI:
             font=ctk.CTkFont(size=14),
             width=120, height=38
         )
-        self.clear_log_button.pack(side="left")
+        self.clear_log_button.pack(side="left", padx=(0, 15))
+
+        self.queue_button = ctk.CTkButton(
+            control_frame, text="Deck Queue",
+            command=self.show_job_queue,
+            font=ctk.CTkFont(size=14),
+            width=130, height=38
+        )
+        self.queue_button.pack(side="left", padx=(0, 15))
+
+        self.recent_pdfs_button = ctk.CTkButton(
+            control_frame, text="Recent PDFs",
+            command=self.show_recent_pdfs,
+            font=ctk.CTkFont(size=14),
+            width=130, height=38
+        )
+        self.recent_pdfs_button.pack(side="left")
 
     def setup_steps_ui(self, parent):
         ctk.CTkLabel(parent, text="Workflow Steps",
@@ -243,114 +420,67 @@ class CardMakerGUI:
             self.step_labels[step_index][0].configure(text=icons.get(status, '⏳'))
 
     def log_message(self, message):
-        timestamp = time.strftime("%H:%M:%S")
-        self.output_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.output_text.see(tk.END)
-        self.root.update_idletasks()
+        # Safe from any thread; the text widget is only touched by drain_log
+        self.log.write(message)
+
+    def drain_log(self):
+        lines = self.log.drain()
+        if lines:
+            self.output_text.insert(tk.END, "".join(lines))
+            excess = int(self.output_text.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+            if excess > 0:
+                self.output_text.delete("1.0", f"{excess + 1}.0")
+            self.output_text.see(tk.END)
+        self.root.after(50, self.drain_log)
 
     def clear_log(self):
         self.output_text.delete(1.0, tk.END)
 
-    def get_image_pattern_for_directory(self, directory):
-        patterns = []
-        for ext in self.supported_image_extensions:
-            patterns.append(os.path.join(directory, f"*{ext}"))
-            patterns.append(os.path.join(directory, f"*{ext.upper()}"))
-        return patterns
-
-    def get_all_image_files_in_directory(self, directory):
-        if not os.path.exists(directory):
-            return []
-        image_files = []
-        for pattern in self.get_image_pattern_for_directory(directory):
-            image_files.extend(glob.glob(pattern))
-        return list(set(image_files))
-
     # -------------- INITIAL CHECKS --------------
     def check_initial_state(self):
         self.log_message("Checking initial project state...")
-        self.project_path = self.find_project_directory()
+        cached = self.engine.cached_project_directory()
+        if cached:
+            self.log_message(f"Found project directory (cached): {cached}")
+            self.set_project_directory(cached)
+            return
+
+        # Scanning home folders can take seconds on network drives; keep the window responsive
+        self.log_message("Searching for project directory in the background...")
+        self._discovery_running = True
+
+        def discover():
+            path = self.engine.find_project_directory()
+            self.root.after(0, lambda: self.finish_discovery(path))
 
-        if not self.project_path:
+        threading.Thread(target=discover, daemon=True).start()
+
+    def finish_discovery(self, path):
+        self._discovery_running = False
+        if not path:
             self.log_message("Could not find silhouette-card-maker directory")
             self.log_message("Please ensure the project is extracted and accessible.")
             return
+        self.set_project_directory(path)
 
-        self.venv_path = os.path.join(self.project_path, "venv")
-        self.decklist_path = os.path.join(self.project_path, "game", "decklist", "my_decklist.txt")
-        self.front_dir = os.path.join(self.project_path, "game", "front")
-        self.double_sided_dir = os.path.join(self.project_path, "game", "double_sided")
-        self.output_dir = os.path.join(self.project_path, "game", "output")
-
-        self.log_message(f"✓ Project directory: {self.project_path}")
-        if os.path.exists(self.venv_path):
-            self.log_message("✓ Virtual environment already exists")
+    def set_project_directory(self, path):
+        self.engine.set_project_directory(path)
+        self.thumbnail_cache = ThumbnailDiskCache(os.path.join(path, ".gui_cache", "thumbnails"))
+        if os.path.exists(self.engine.venv_path):
+            self.log_message(f"✓ Virtual environment already exists: {self.engine.venv_path}")
             self.update_step_status(1, 'completed')
         else:
             self.log_message("○ Virtual environment needs to be created")
 
-    def validate_project_directory(self, path):
-        if not os.path.exists(path):
-            return False
-        expected_items = ["game", "plugins", "create_pdf.py"]
-        for item in expected_items:
-            if not os.path.exists(os.path.join(path, item)):
-                return False
-        return True
-
-    def find_project_directory(self):
-        project_folder_name = PROJECT_FOLDER_NAME
-        search_locations = [
-            os.getcwd(),
-            os.path.expanduser("~"),
-            os.path.join(os.path.expanduser("~"), "Downloads"),
-            os.path.join(os.path.expanduser("~"), "Documents"),
-            os.path.join(os.path.expanduser("~"), "Desktop"),
-            os.path.join(os.path.expanduser("~"), "Projects"),
-            os.path.join(os.path.expanduser("~"), "Workspace"),
-            os.path.dirname(os.getcwd()),
-            os.path.dirname(os.path.dirname(os.getcwd())),
-        ]
-
-        extended = []
-        for loc in search_locations:
-            extended.append(loc)
-            try:
-                if os.path.exists(loc):
-                    for item in os.listdir(loc):
-                        p = os.path.join(loc, item)
-                        if os.path.isdir(p):
-                            extended.append(p)
-            except Exception:
-                continue
-
-        for loc in extended:
-            if not loc or not os.path.exists(loc):
-                continue
-
-            candidate = os.path.join(loc, project_folder_name)
-            if os.path.exists(candidate) and self.validate_project_directory(candidate):
-                self.log_message(f"Found project directory: {candidate}")
-                return candidate
-
-            if os.path.basename(loc) == project_folder_name and self.validate_project_directory(loc):
-                self.log_message(f"Found project directory: {loc}")
-                return loc
-
-            nested = os.path.join(candidate, project_folder_name)
-            if os.path.exists(nested) and self.validate_project_directory(nested):
-                self.log_message(f"Found project directory (nested): {nested}")
-                return nested
-
-        self.log_message(f"Could not find '{project_folder_name}' in common locations.")
-        return None
-
     # -------------- WORKFLOW --------------
     def start_workflow(self):
         if self.is_running:
             messagebox.showwarning("Warning", "Workflow is already running!")
             return
-        if not self.project_path:
+        if not self.engine.project_path and getattr(self, "_discovery_running", False):
+            messagebox.showinfo("Please Wait", "Still searching for the 'silhouette-card-maker' directory...")
+            return
+        if not self.engine.project_path:
             messagebox.showerror("Project Not Found",
                                  "Could not find 'silhouette-card-maker' directory.\n\n"
                                  "Please ensure the project is extracted and accessible.")
@@ -363,129 +493,28 @@ class CardMakerGUI:
 
     def run_workflow(self):
         try:
-            self.execute_step_1()
-            self.execute_step_2()
-            self.execute_step_3()
-            self.execute_step_4()
+            self.engine.prepare()
             self.root.after(0, self.execute_step_5_main_thread)
         except Exception as e:
             self.log_message(f"Workflow failed: {e}")
-            self.status_var.set("Workflow failed")
+            self.engine.finish_run()
+            self.root.after(0, lambda: self.status_var.set("Workflow failed"))
             self.is_running = False
             self.root.after(0, lambda: self.start_button.configure(state='normal'))
 
-    # Step 1
-    def execute_step_1(self):
-        self.root.after(0, lambda: self.update_step_status(0, 'running'))
-        self.root.after(0, lambda: self.status_var.set("Navigating to project directory..."))
-
-        if not self.project_path or not os.path.exists(self.project_path):
-            raise Exception("Project directory not found or not accessible")
-
-        os.chdir(self.project_path)
-        self.log_message(f"✓ Changed to project directory: {os.getcwd()}")
-        self.root.after(0, lambda: self.update_step_status(0, 'completed'))
-        self.root.after(0, lambda: self.progress_bar.set(0.14))
-
-    # Step 2
-    def execute_step_2(self):
-        self.root.after(0, lambda: self.update_step_status(1, 'running'))
-        self.root.after(0, lambda: self.status_var.set("Creating virtual environment..."))
-
-        if not os.path.exists(self.venv_path):
-            self.log_message("Creating virtual environment...")
-            result = subprocess.run([sys.executable, "-m", "venv", "venv"],
-                                    capture_output=True, text=True, cwd=self.project_path)
-            if result.returncode != 0:
-                raise Exception(f"Failed to create virtual environment: {result.stderr}")
-            self.log_message("✓ Virtual environment created successfully")
-        else:
-            self.log_message("✓ Virtual environment already exists")
-
-        self.root.after(0, lambda: self.update_step_status(1, 'completed'))
-        self.root.after(0, lambda: self.progress_bar.set(0.28))
-
-    # Step 3
-    def execute_step_3(self):
-        self.root.after(0, lambda: self.update_step_status(2, 'running'))
-        self.root.after(0, lambda: self.status_var.set("Configuring virtual environment..."))
-
-        if os.name == "nt":
-            venv_python = os.path.join(self.venv_path, "Scripts", "python.exe")
-        else:
-            venv_python = os.path.join(self.venv_path, "bin", "python")
-        if not os.path.exists(venv_python):
-            raise Exception("Virtual environment Python executable not found")
-
-        self.venv_python = venv_python
-        self.log_message("✓ Virtual environment configured for use")
-
-        self.root.after(0, lambda: self.status_var.set("Installing requirements..."))
-        requirements_path = os.path.join(self.project_path, "requirements.txt")
-        if not os.path.exists(requirements_path):
-            self.log_message("Warning: requirements.txt not found, skipping package installation")
-        else:
-            cmd = [self.venv_python, "-m", "pip", "install", "-r", "requirements.txt"]
-            self.log_message(f"Running: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=self.project_path)
-            if result.stdout:
-                for line in result.stdout.strip().splitlines():
-                    if line.strip():
-                        self.log_message(f"pip: {line}")
-            if result.stderr:
-                for line in result.stderr.strip().splitlines():
-                    if line.strip() and not line.startswith("WARNING"):
-                        self.log_message(f"pip error: {line}")
-            if result.returncode != 0:
-                raise Exception(f"pip install failed with exit code: {result.returncode}")
-            self.log_message("✓ Requirements installed successfully")
-
-        self.root.after(0, lambda: self.update_step_status(2, 'completed'))
-        self.root.after(0, lambda: self.progress_bar.set(0.42))
-
-    # Step 4
-    def execute_step_4(self):
-        self.root.after(0, lambda: self.update_step_status(3, 'running'))
-        self.root.after(0, lambda: self.status_var.set("Cleaning image files..."))
-
-        directories = [self.front_dir, self.double_sided_dir]
-        total_deleted = 0
-        for directory in directories:
-            if os.path.exists(directory):
-                image_files = self.get_all_image_files_in_directory(directory)
-                for image_file in image_files:
-                    try:
-                        os.remove(image_file)
-                        total_deleted += 1
-                    except Exception as e:
-                        self.log_message(f"Warning: Could not delete {image_file}: {e}")
-                self.log_message(f"✓ Cleaned {len(image_files)} image files from {directory}")
-            else:
-                self.log_message(f"Warning: Directory not found: {directory}")
-        self.log_message(f"✓ Total image files deleted: {total_deleted}")
-
-        self.root.after(0, lambda: self.update_step_status(3, 'completed'))
-        self.root.after(0, lambda: self.progress_bar.set(0.56))
-
     # Step 5 (main thread)
     def execute_step_5_main_thread(self):
-        self.update_step_status(4, 'running')
-        self.status_var.set("Choose input method...")
         self.log_message("Waiting for user to choose input method...")
 
         choice, plugin_info = self.get_input_method_choice()
         if choice == "upload":
             try:
                 uploaded_count = self.upload_card_images()
-                if uploaded_count == 0:
-                    raise Exception("No images were uploaded")
-                self.log_message(f"✓ {uploaded_count} images uploaded successfully")
-                self.input_method = "upload"
-                self.update_step_status(4, 'completed')
-                self.progress_bar.set(0.70)
+                self.engine.use_uploaded_images(uploaded_count)
                 threading.Thread(target=self.execute_step_6, daemon=True).start()
             except Exception as e:
                 self.log_message(f"Step 5 failed: {e}")
+                self.engine.finish_run()
                 self.status_var.set("Workflow failed")
                 self.is_running = False
                 self.start_button.configure(state='normal')
@@ -493,25 +522,17 @@ class CardMakerGUI:
             try:
                 self.log_message(f"Selected: {plugin_info.get('game')} · {plugin_info.get('method')}")
                 decklist_content = self.get_decklist_input()
-                if not decklist_content:
-                    raise Exception("No decklist provided")
-                os.makedirs(os.path.dirname(self.decklist_path), exist_ok=True)
-                with open(self.decklist_path, "w", encoding="utf-8") as f:
-                    f.write(decklist_content)
-                self.log_message(f"✓ Decklist file created: {self.decklist_path}")
-                self.input_method = "plugin"
-                self.selected_dir = plugin_info["dir"]
-                self.selected_source = plugin_info["src"]
-                self.update_step_status(4, 'completed')
-                self.progress_bar.set(0.70)
+                self.engine.use_decklist(decklist_content, plugin_info["dir"], plugin_info["src"])
                 threading.Thread(target=self.execute_step_6, daemon=True).start()
             except Exception as e:
                 self.log_message(f"Step 5 failed: {e}")
+                self.engine.finish_run()
                 self.status_var.set("Workflow failed")
                 self.is_running = False
                 self.start_button.configure(state='normal')
         else:
             self.log_message("No input method selected - workflow cancelled")
+            self.engine.finish_run()
             self.status_var.set("Workflow cancelled")
             self.is_running = False
             self.start_button.configure(state='normal')
@@ -604,7 +625,7 @@ class CardMakerGUI:
     def upload_card_images(self):
         win = ctk.CTkToplevel(self.root)
         win.title("Upload Card Images")
-        win.geometry("520x600")
+        win.geometry("560x620")
         win.transient(self.root)
         win.grab_set()
 
@@ -617,8 +638,8 @@ class CardMakerGUI:
         ctk.CTkLabel(frame, text="Upload your card image files to the appropriate folders:",
                      font=ctk.CTkFont(size=12)).pack(pady=(0, 20))
 
-        os.makedirs(self.front_dir, exist_ok=True)
-        os.makedirs(self.double_sided_dir, exist_ok=True)
+        os.makedirs(self.engine.front_dir, exist_ok=True)
+        os.makedirs(self.engine.double_sided_dir, exist_ok=True)
 
         upload_counts = {"front": 0, "double_sided": 0}
 
@@ -631,23 +652,60 @@ class CardMakerGUI:
                                     font=ctk.CTkFont(size=12), text_color="gray")
         front_status.pack(anchor="w", padx=10, pady=(0, 10))
 
+        image_types = [f"*{ext}" for ext in sorted(self.supported_image_extensions)]
+        filetypes = [("All image files", " ".join(image_types)),
+                     ("PNG files", "*.png"),
+                     ("JPEG files", "*.jpg *.jpeg"),
+                     ("All files", "*.*")]
+        import_buttons = []
+        imports_running = {"val": 0}
+
+        def run_import(sources, key, destination, status, noun):
+            # Copies run on a worker thread; progress streams into the status label
+            imports_running["val"] += 1
+            for button in import_buttons:
+                button.configure(state="disabled")
+            status.configure(text="Importing...", text_color="gray")
+
+            def show_progress(done, total):
+                def update():
+                    if status.winfo_exists():
+                        status.configure(text=f"Importing {done}/{total}...")
+                self.root.after(0, update)
+
+            def finish(count):
+                imports_running["val"] -= 1
+                if not win.winfo_exists():
+                    return
+                if imports_running["val"] == 0:
+                    for button in import_buttons:
+                        button.configure(state="normal")
+                upload_counts[key] += count
+                status.configure(text=f"{upload_counts[key]} {noun} images uploaded", text_color="green")
+                update_total()
+                self.log_message(f"✓ Uploaded {count} {noun} card images")
+
+            def work():
+                count = self.engine.copy_files_to_directory(sources, destination, on_progress=show_progress)
+                self.root.after(0, lambda: finish(count))
+
+            threading.Thread(target=work, daemon=True).start()
+
         def upload_front_images():
-            image_types = [f"*{ext}" for ext in sorted(self.supported_image_extensions)]
-            files = filedialog.askopenfilenames(
-                title="Select Front Card Images",
-                filetypes=[("All image files", " ".join(image_types)),
-                           ("PNG files", "*.png"),
-                           ("JPEG files", "*.jpg *.jpeg"),
-                           ("All files", "*.*")],
-                parent=win
-            )
+            files = filedialog.askopenfilenames(title="Select Front Card Images",
+                                                filetypes=filetypes, parent=win)
             if files:
-                count = self.copy_files_to_directory(files, self.front_dir)
-                upload_counts["front"] = count
-                front_status.configure(text=f"{count} front images uploaded", text_color="green")
-                self.log_message(f"✓ Uploaded {count} front card images")
+                run_import(files, "front", self.engine.front_dir, front_status, "front")
+
+        def upload_front_folder():
+            folder = filedialog.askdirectory(title="Select a Folder of Front Card Images", parent=win)
+            if folder:
+                run_import([folder], "front", self.engine.front_dir, front_status, "front")
 
-        ctk.CTkButton(front_frame, text="📁 Choose Front Images", command=upload_front_images).pack(pady=(5, 10), padx=10, anchor="w")
+        front_row = ctk.CTkFrame(front_frame, fg_color="transparent")
+        front_row.pack(pady=(5, 10), padx=10, anchor="w")
+        import_buttons.append(ctk.CTkButton(front_row, text="📁 Choose Front Images", command=upload_front_images))
+        import_buttons.append(ctk.CTkButton(front_row, text="📂 Import Folder", command=upload_front_folder))
 
         double_frame = CTkLabelFrame(frame, text="Double-Faced Cards")
         double_frame.pack(fill="x", pady=(0, 15), padx=10)
@@ -659,22 +717,23 @@ class CardMakerGUI:
         double_status.pack(anchor="w", padx=10, pady=(0, 10))
 
         def upload_double_images():
-            image_types = [f"*{ext}" for ext in sorted(self.supported_image_extensions)]
-            files = filedialog.askopenfilenames(
-                title="Select Double-Faced Card Images",
-                filetypes=[("All image files", " ".join(image_types)),
-                           ("PNG files", "*.png"),
-                           ("JPEG files", "*.jpg *.jpeg"),
-                           ("All files", "*.*")],
-                parent=win
-            )
+            files = filedialog.askopenfilenames(title="Select Double-Faced Card Images",
+                                                filetypes=filetypes, parent=win)
             if files:
-                count = self.copy_files_to_directory(files, self.double_sided_dir)
-                upload_counts["double_sided"] = count
-                double_status.configure(text=f"{count} double-faced images uploaded", text_color="green")
-                self.log_message(f"✓ Uploaded {count} double-faced card images")
+                run_import(files, "double_sided", self.engine.double_sided_dir, double_status, "double-faced")
+
+        def upload_double_folder():
+            folder = filedialog.askdirectory(title="Select a Folder of Double-Faced Card Images", parent=win)
+            if folder:
+                run_import([folder], "double_sided", self.engine.double_sided_dir, double_status, "double-faced")
 
-        ctk.CTkButton(double_frame, text="📁 Choose Double-Faced Images", command=upload_double_images).pack(pady=(5, 10), padx=10, anchor="w")
+        double_row = ctk.CTkFrame(double_frame, fg_color="transparent")
+        double_row.pack(pady=(5, 10), padx=10, anchor="w")
+        import_buttons.append(ctk.CTkButton(double_row, text="📁 Choose Double-Faced Images",
+                                            command=upload_double_images))
+        import_buttons.append(ctk.CTkButton(double_row, text="📂 Import Folder", command=upload_double_folder))
+        for button in import_buttons:
+            button.pack(side="left", padx=(0, 10))
 
         # Summary line for total loaded
         total_label = ctk.CTkLabel(frame, text="Total loaded: 0 images", font=ctk.CTkFont(size=12))
@@ -684,25 +743,14 @@ class CardMakerGUI:
             total = upload_counts["front"] + upload_counts["double_sided"]
             total_label.configure(text=f"Total loaded: {total} images")
 
-        # Hook into status updates
-        def wrap(fn):
-            def inner(*a, **kw):
-                r = fn(*a, **kw)
-                update_total()
-                return r
-            return inner
-
-        # rebind with wrappers to update totals after each upload
-        front_button = [w for w in front_frame.winfo_children() if isinstance(w, ctk.CTkButton)][0]
-        double_button = [w for w in double_frame.winfo_children() if isinstance(w, ctk.CTkButton)][0]
-        front_button.configure(command=wrap(upload_front_images))
-        double_button.configure(command=wrap(upload_double_images))
-
         btns = ctk.CTkFrame(frame, fg_color="transparent")
         btns.pack(pady=(10, 0))
         total_uploaded = {"val": 0}
 
         def on_done():
+            if imports_running["val"]:
+                messagebox.showinfo("Importing", "Please wait for the import to finish.", parent=win)
+                return
             total = upload_counts["front"] + upload_counts["double_sided"]
             if total == 0:
                 messagebox.showwarning("No Images", "Please upload at least one image before continuing.")
@@ -716,25 +764,6 @@ class CardMakerGUI:
         win.wait_window()
         return total_uploaded["val"]
 
-    def copy_files_to_directory(self, source_files, destination_dir):
-        copied = 0
-        for src in source_files:
-            try:
-                filename = os.path.basename(src)
-                dest = os.path.join(destination_dir, filename)
-                if os.path.exists(dest):
-                    name, ext = os.path.splitext(filename)
-                    counter = 1
-                    while os.path.exists(dest):
-                        new_name = f"{name}_{counter}{ext}"
-                        dest = os.path.join(destination_dir, new_name)
-                        counter += 1
-                shutil.copy2(src, dest)
-                copied += 1
-            except Exception as e:
-                self.log_message(f"Warning: Could not copy {src}: {e}")
-        return copied
-
     def get_decklist_input(self):
         win = ctk.CTkToplevel(self.root)
         win.title("Enter Decklist")
@@ -784,160 +813,100 @@ class CardMakerGUI:
         return result["content"]
 
     # -------------- Step 6: Download/Process Images --------------
-    def execute_step_6(self):
+    def execute_step_6(self, reuse_stored=True):
+        # Downloads open the preview straight away; thumbnails appear as
+        # the plugin writes images and the buttons unlock when it is done
+        downloading = self.engine.input_method == "plugin"
         try:
-            self.root.after(0, lambda: self.update_step_status(5, 'running'))
-            if getattr(self, "input_method", "") == "upload":
-                self.root.after(0, lambda: self.status_var.set("Processing uploaded images..."))
-                front_images = self.get_all_image_files_in_directory(self.front_dir)
-                double_images = self.get_all_image_files_in_directory(self.double_sided_dir)
-                total = len(front_images) + len(double_images)
-                if total == 0:
-                    raise Exception("No uploaded images found")
-                self.log_message(f"✓ Found {len(front_images)} front and {len(double_images)} double-faced images")
-                self.root.after(0, lambda: self.update_step_status(5, 'completed'))
-                self.root.after(0, self.show_thumbnail_preview)
-            elif getattr(self, "input_method", "") == "plugin":
-                self.root.after(0, lambda: self.status_var.set("Downloading card images..."))
-                self.root.after(0, self.show_loading_indicator)
-
-                plug_dir = getattr(self, "selected_dir", None)
-                plug_src = getattr(self, "selected_source", None)
-                if not plug_dir or not plug_src:
-                    raise Exception("Plugin selection missing")
-
-                cmd = [self.venv_python, f"plugins/{plug_dir}/fetch.py", "game/decklist/my_decklist.txt", plug_src]
-
-                self.log_message("Starting card image download...")
-                self.log_message(f"Command: {' '.join(cmd)}")
-
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                           text=True, cwd=self.project_path)
-                while True:
-                    output = process.stdout.readline()
-                    if output == "" and process.poll() is not None:
-                        break
-                    if output:
-                        self.root.after(0, lambda msg=output.strip(): self.log_message(msg))
-
-                return_code = process.poll()
-                stderr = process.stderr.read()
-                if stderr:
-                    self.log_message(f"Errors: {stderr}")
-                if return_code != 0:
-                    raise Exception(f"Download failed with exit code: {return_code}")
-
-                self.log_message("✓ Card images downloaded successfully")
-                self.root.after(0, lambda: self.update_step_status(5, 'completed'))
-                self.root.after(0, self.show_thumbnail_preview)
-            self.root.after(0, lambda: self.progress_bar.set(0.85))
+            if downloading:
+                self.root.after(0, lambda: self.show_thumbnail_preview(downloading=True))
+            self.engine.execute_step_6(reuse_stored)
+            self.root.after(0, self.finish_thumbnail_preview if downloading else self.show_thumbnail_preview)
         except Exception as e:
             self.log_message(f"Step 6 failed: {e}")
+            self.engine.finish_run()
+            self.root.after(0, self.close_thumbnail_preview)
+            self.root.after(0, lambda: self.update_step_status(5, 'error'))
             self.root.after(0, lambda: self.status_var.set("Workflow failed"))
         finally:
             self.is_running = False
             self.root.after(0, lambda: self.start_button.configure(state='normal'))
-            self.root.after(0, self.hide_loading_indicator)
-
-    # ---------- Loading Indicators (CTk) ----------
-    def show_loading_indicator(self):
-        if getattr(self, "_loading_running", False):
-            return
-        self._loading_running = True
-
-        self.loading_win = ctk.CTkToplevel(self.root)
-        self.loading_win.title("Downloading...")
-        self.loading_win.geometry("360x130")
-        self.loading_win.transient(self.root)
-        self.loading_win.resizable(False, False)
-
-        frame = ctk.CTkFrame(self.loading_win, corner_radius=8)
+            self.root.after(0, self.hide_task_window)
+
+    # ---------- Progress window (CTk) ----------
+    # Driven by the engine's task progress events; the only timer is a 1 s
+    # elapsed-time tick while the process has not reported anything yet.
+    def show_task_window(self, title, heading):
+        self.hide_task_window()
+        self.task_win = ctk.CTkToplevel(self.root)
+        self.task_win.title(title)
+        self.task_win.geometry("420x170")
+        self.task_win.transient(self.root)
+        self.task_win.resizable(False, False)
+
+        frame = ctk.CTkFrame(self.task_win, corner_radius=8)
         frame.pack(fill="both", expand=True, padx=20, pady=20)
 
-        ctk.CTkLabel(frame, text="Downloading card images...", font=ctk.CTkFont(size=14)).pack(pady=(0,10))
-        self.loading_bar = ctk.CTkProgressBar(frame)
-        self.loading_bar.pack(fill="x", padx=5)
-        self.loading_bar.set(0)
-
-        # simple indeterminate animation
-        def animate(val=[0.0], dir=[1]):
-            if not self._loading_running:
-                return
-            val[0] += 0.02 * dir[0]
-            if val[0] >= 1:
-                dir[0] = -1
-            elif val[0] <= 0:
-                dir[0] = 1
-            self.loading_bar.set(max(0.0, min(1.0, val[0])))
-            self.loading_win.after(20, animate)
-        animate()
-
-    def hide_loading_indicator(self):
-        if getattr(self, "_loading_running", False):
-            self._loading_running = False
-            try:
-                self.loading_win.destroy()
-            except Exception:
-                pass
-
-    def show_pdf_loading_indicator(self):
-        if getattr(self, "_pdf_loading_running", False):
-            return
-        self._pdf_loading_running = True
+        ctk.CTkLabel(frame, text=heading, font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(0,10))
+        self.task_bar = ctk.CTkProgressBar(frame)
+        self.task_bar.pack(fill="x", padx=5)
+        self.task_bar.set(0)
+        self.task_detail_var = ctk.StringVar(value="Starting...")
+        ctk.CTkLabel(frame, textvariable=self.task_detail_var, font=ctk.CTkFont(size=11)).pack(pady=(10,0))
 
-        self.pdf_win = ctk.CTkToplevel(self.root)
-        self.pdf_win.title("Creating PDF...")
-        self.pdf_win.geometry("380x150")
-        self.pdf_win.transient(self.root)
-        self.pdf_win.resizable(False, False)
+        self._task_started = time.monotonic()
+        self._task_reported = False
 
-        frame = ctk.CTkFrame(self.pdf_win, corner_radius=8)
-        frame.pack(fill="both", expand=True, padx=20, pady=20)
-
-        ctk.CTkLabel(frame, text="Creating PDF...", font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(0,5))
-        ctk.CTkLabel(frame, text="This may take a few moments depending on card count",
-                     font=ctk.CTkFont(size=11)).pack(pady=(0,10))
-
-        self.pdf_bar = ctk.CTkProgressBar(frame)
-        self.pdf_bar.pack(fill="x", padx=5)
-        self.pdf_bar.set(0)
-
-        def animate(val=[0.0], dir=[1]):
-            if not self._pdf_loading_running:
+        def tick():
+            if not self.task_win.winfo_exists() or self._task_reported:
                 return
-            val[0] += 0.02 * dir[0]
-            if val[0] >= 1:
-                dir[0] = -1
-            elif val[0] <= 0:
-                dir[0] = 1
-            self.pdf_bar.set(max(0.0, min(1.0, val[0])))
-            self.pdf_win.after(20, animate)
-        animate()
-
-    def hide_pdf_loading_indicator(self):
-        if getattr(self, "_pdf_loading_running", False):
-            self._pdf_loading_running = False
+            elapsed = int(time.monotonic() - self._task_started)
+            self.task_detail_var.set(f"Working... {elapsed // 60}:{elapsed % 60:02d} elapsed")
+            self.task_win.after(1000, tick)
+        self.task_win.after(1000, tick)
+
+    def update_task_window(self, progress):
+        preview = self.preview
+        if preview is not None and preview["downloading"] and preview["win"].winfo_exists():
+            if progress.fraction is not None:
+                preview["bar"].set(progress.fraction)
+            preview["status"].configure(text=f"Downloading: {describe_progress(progress)}")
+        win = getattr(self, "task_win", None)
+        if win is None or not win.winfo_exists():
+            return
+        self._task_reported = True
+        if progress.fraction is not None:
+            self.task_bar.set(progress.fraction)
+        self.task_detail_var.set(describe_progress(progress))
+
+    def hide_task_window(self):
+        win = getattr(self, "task_win", None)
+        self.task_win = None
+        if win is not None:
             try:
-                self.pdf_win.destroy()
+                win.destroy()
             except Exception:
                 pass
 
     # ---------- Thumbnails (CTk Scrollable) ----------
-    def show_thumbnail_preview(self):
-        image_files = []
-        for directory in [self.front_dir, self.double_sided_dir]:
-            if os.path.exists(directory):
-                for p in self.get_all_image_files_in_directory(directory):
-                    rel = os.path.relpath(p, self.project_path)
-                    image_files.append((p, rel))
-
-        if not image_files:
+    def preview_items(self, paths=None):
+        # [(image_path, path relative to the project)], front images first
+        if paths is None:
+            paths = []
+            for directory in [self.engine.front_dir, self.engine.double_sided_dir]:
+                if os.path.exists(directory):
+                    paths.extend(self.engine.get_all_image_files_in_directory(directory))
+        return [(p, os.path.relpath(p, self.engine.project_path)) for p in paths]
+
+    def show_thumbnail_preview(self, downloading=False):
+        self.close_thumbnail_preview()
+        image_files = [] if downloading else self.preview_items()
+        if not image_files and not downloading:
             messagebox.showinfo("No Images", "No card images found to preview.")
             self.continue_to_pdf_step()
             return
 
         win = ctk.CTkToplevel(self.root)
-        win.title(f"Card Image Preview - {len(image_files)} images found")
         win.geometry("1200x800")
         win.transient(self.root)
         win.grab_set()
@@ -947,51 +916,133 @@ class CardMakerGUI:
         header.pack(fill="x", padx=15, pady=(15,10))
         ctk.CTkLabel(header, text="Downloaded Card Images",
                      font=ctk.CTkFont(size=18, weight="bold")).pack(side="left")
-        ctk.CTkLabel(header, text=f"Total: {len(image_files)} images",
-                     font=ctk.CTkFont(size=13)).pack(side="right")
-
-        # Scrollable thumbnails
-        scroll = ctk.CTkScrollableFrame(win, width=1150, height=620)
-        scroll.pack(fill="both", expand=True, padx=15, pady=(0,15))
-
-        self.load_thumbnails(scroll, image_files)
-
-        # Buttons
+        total = ctk.CTkLabel(header, text="", font=ctk.CTkFont(size=13))
+        total.pack(side="right")
+        status = ctk.CTkLabel(header, text="Downloading...", font=ctk.CTkFont(size=12), text_color="gray")
+        bar = ctk.CTkProgressBar(header, width=160)
+        if downloading:
+            status.pack(side="left", padx=15)
+            bar.pack(side="left")
+            bar.set(0)
+
+        # Virtualized thumbnails: widgets only exist for the rows in view
+        grid = self.load_thumbnails(win, image_files)
+
+        # Buttons stay disabled until the download has finished
         btns = ctk.CTkFrame(win, fg_color="transparent")
         btns.pack(pady=(0, 15))
-        ctk.CTkButton(btns, text="Images Look Good - Create PDF",
-                      command=lambda: (win.destroy(), self.continue_to_pdf_step())).pack(side="left", padx=(0,10))
-        ctk.CTkButton(btns, text="Re-download Images",
-                      command=lambda: (win.destroy(), self.redownload_images())).pack(side="left", padx=(0,10))
-        ctk.CTkButton(btns, text="Skip PDF Creation",
-                      command=lambda: (win.destroy(), self.skip_pdf_creation())).pack(side="left")
+        buttons = [
+            ctk.CTkButton(btns, text="Images Look Good - Create PDF",
+                          command=lambda: (self.close_thumbnail_preview(), self.continue_to_pdf_step())),
+            ctk.CTkButton(btns, text="Re-download Images",
+                          command=lambda: (self.close_thumbnail_preview(), self.redownload_images())),
+            ctk.CTkButton(btns, text="Skip PDF Creation",
+                          command=lambda: (self.close_thumbnail_preview(), self.skip_pdf_creation())),
+        ]
+        for i, button in enumerate(buttons):
+            button.pack(side="left", padx=(0, 10 if i < len(buttons) - 1 else 0))
+            if downloading:
+                button.configure(state="disabled")
+
+        self.preview = {"win": win, "grid": grid, "header": header, "total": total, "status": status,
+                        "bar": bar, "buttons": buttons, "downloading": downloading}
+        self.update_preview_count()
+        if not downloading:
+            self.check_preview_near_duplicates()
+
+    def add_preview_images(self, paths):
+        preview = self.preview
+        if preview is None or not preview["downloading"] or not preview["win"].winfo_exists():
+            return
+        preview["grid"].append(self.preview_items(paths))
+        self.update_preview_count()
+
+    def finish_thumbnail_preview(self):
+        # The download is done: show every image in folder order, then unlock
+        # the buttons. A preview the user closed meanwhile is simply reopened.
+        preview = self.preview
+        if preview is None or not preview["win"].winfo_exists():
+            self.show_thumbnail_preview()
+            return
+        image_files = self.preview_items()
+        if not image_files:
+            self.close_thumbnail_preview()
+            messagebox.showinfo("No Images", "No card images found to preview.")
+            self.continue_to_pdf_step()
+            return
+        preview["downloading"] = False
+        preview["grid"].set_items(image_files)
+        preview["status"].pack_forget()
+        preview["bar"].pack_forget()
+        for button in preview["buttons"]:
+            button.configure(state="normal")
+        self.update_preview_count()
+        self.check_preview_near_duplicates()
+
+    def close_thumbnail_preview(self):
+        preview, self.preview = self.preview, None
+        if preview is not None and preview["win"].winfo_exists():
+            preview["win"].destroy()
+
+    def update_preview_count(self):
+        preview = self.preview
+        count = len(preview["grid"].items)
+        found = f"{count} images so far" if preview["downloading"] else f"{count} images found"
+        preview["win"].title(f"Card Image Preview - {found}")
+        preview["total"].configure(text=f"Total: {count} images")
+
+    def check_preview_near_duplicates(self):
+        if NEAR_DUPLICATE_DISTANCE > 0:
+            self.check_near_duplicates(self.preview["header"], [p for p, _ in self.preview["grid"].items])
+
+    def check_near_duplicates(self, header, paths):
+        # Hashing runs in the background; the header reports when it is done
+        status = ctk.CTkLabel(header, text="Checking for look-alike images...",
+                              font=ctk.CTkFont(size=12), text_color="gray")
+        status.pack(side="right", padx=15)
+
+        def show(groups):
+            if not status.winfo_exists():
+                return
+            if not groups:
+                status.configure(text="No look-alike images")
+                return
+            status.configure(text=f"⚠ {len(groups)} groups of look-alike images", text_color="orange")
+            ctk.CTkButton(header, text="Show", width=60,
+                          command=lambda: self.show_near_duplicates(groups)).pack(side="right")
 
-    def load_thumbnails(self, parent, image_files):
-        self._thumbnails_refs.clear()
-        cols = 4
-        for i, (image_path, rel_path) in enumerate(image_files):
-            row = i // cols
-            col = i % cols
+        def work():
+            try:
+                groups = self.engine.find_near_duplicates(paths)
+            except Exception as e:
+                self.log_message(f"Warning: Look-alike check failed: {e}")
+                groups = []
+            self.root.after(0, lambda: show(groups))
 
-            cell = ctk.CTkFrame(parent, corner_radius=8)
-            cell.grid(row=row, column=col, padx=8, pady=8, sticky="nsew")
+        threading.Thread(target=work, daemon=True).start()
 
-            try:
-                with Image.open(image_path) as img:
-                    img_copy = img.copy()
-                img_copy.thumbnail((220, 300), Image.Resampling.LANCZOS)
-                # Use CTkImage for dark/light support
-                cimg = ctk.CTkImage(light_image=img_copy, dark_image=img_copy, size=img_copy.size)
-                lbl = ctk.CTkLabel(cell, image=cimg, text="")
-                lbl.pack(padx=6, pady=6)
-                self._thumbnails_refs.append(cimg)
-
-                info = f"{os.path.basename(image_path)}"
-                ctk.CTkLabel(cell, text=info, font=ctk.CTkFont(size=11)).pack(pady=(0,4))
+    def show_near_duplicates(self, groups):
+        win = ctk.CTkToplevel(self.root)
+        win.title("Look-alike Images")
+        win.geometry("640x420")
+        win.transient(self.root)
 
-            except Exception as e:
-                ctk.CTkLabel(cell, text=f"Error loading image:\n{e}",
-                             text_color="red", font=ctk.CTkFont(size=11)).pack(padx=6, pady=6)
+        ctk.CTkLabel(win, text="These images look the same but are different files. "
+                               "Remove any you did not mean to print twice.",
+                     font=ctk.CTkFont(size=12), wraplength=600).pack(padx=15, pady=(15, 8))
+        text = ctk.CTkTextbox(win, font=ctk.CTkFont(family="Consolas", size=11))
+        text.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+        for i, group in enumerate(groups, 1):
+            text.insert("end", f"Group {i}:\n")
+            for path in group:
+                text.insert("end", f"    {os.path.relpath(path, self.engine.project_path)}\n")
+        text.configure(state="disabled")
+
+    def load_thumbnails(self, parent, image_files):
+        loader = ThumbnailLoader(cache=self.thumbnail_cache, tracer=self.engine.tracer)
+        grid = VirtualThumbnailGrid(parent, image_files, loader, fg_color="transparent")
+        grid.pack(fill="both", expand=True, padx=15, pady=(0,15))
+        return grid
 
     def close_preview_and_continue(self, preview_window):
         preview_window.destroy()
@@ -1003,13 +1054,16 @@ class CardMakerGUI:
 
     def redownload_workflow(self):
         try:
-            self.execute_step_4()
-            self.execute_step_6()
+            # The user rejected these images: drop them and fetch every card
+            # fresh, instead of storing them and putting them straight back
+            self.engine.execute_step_4(store_images=False)
+            self.execute_step_6(reuse_stored=False)
         except Exception as e:
             self.log_message(f"Re-download failed: {e}")
 
     def skip_pdf_creation(self):
         self.log_message("PDF creation skipped by user")
+        self.engine.finish_run()
         self.update_step_status(6, 'completed')
         self.progress_bar.set(1.0)
         self.status_var.set("Workflow completed - PDF creation skipped")
@@ -1021,33 +1075,40 @@ class CardMakerGUI:
     def execute_step_7(self):
         self.update_step_status(6, 'running')
         self.status_var.set("Opening PDF creation options...")
-        options = self.get_pdf_options()
+        options, settings = self.get_pdf_options({"pdf_shards": self.engine.pdf_shards,
+                                                  "preflight": self.engine.preflight})
         if options is not None:
+            self.engine.pdf_shards = settings["pdf_shards"]
+            self.engine.preflight = settings["preflight"]
             threading.Thread(target=self.create_pdf_threaded, args=(options,), daemon=True).start()
         else:
             self.log_message("PDF creation cancelled by user")
+            self.engine.finish_run()
             self.update_step_status(6, 'completed')
             self.progress_bar.set(1.0)
             self.status_var.set("Workflow completed - PDF creation cancelled")
 
     def create_pdf_threaded(self, options):
         try:
-            self.root.after(0, self.show_pdf_loading_indicator)
-            self.create_pdf(options)
-            self.root.after(0, lambda: self.update_step_status(6, 'completed'))
-            self.root.after(0, lambda: self.progress_bar.set(1.0))
+            self.root.after(0, lambda: self.show_task_window("Creating PDF...", "Creating PDF..."))
+            pdf_file = self.engine.create_pdf(options)
             self.root.after(0, lambda: self.status_var.set("Workflow completed successfully!"))
+            self.root.after(0, lambda: self.show_pdf_result(pdf_file))
         except Exception as e:
-            self.root.after(0, lambda: self.log_message(f"PDF creation failed: {e}"))
+            self.log_message(f"PDF creation failed: {e}")
             self.root.after(0, lambda: self.update_step_status(6, 'error'))
             self.root.after(0, lambda: self.status_var.set("PDF creation failed"))
         finally:
-            self.root.after(0, self.hide_pdf_loading_indicator)
+            self.engine.finish_run()
+            self.root.after(0, self.hide_task_window)
 
-    def get_pdf_options(self):
+    def get_pdf_options(self, settings):
+        # Returns (create_pdf.py options, settings) or (None, None) if cancelled.
+        # settings ({"pdf_shards", "preflight"}) are what the GUI handles itself;
+        # the caller applies them to whichever engine builds the PDF.
         win = ctk.CTkToplevel(self.root)
         win.title("PDF Creation Options")
-        win.geometry("540x660")
+        win.geometry("540x740")
         win.transient(self.root)
         win.grab_set()
 
@@ -1159,6 +1220,23 @@ class CardMakerGUI:
 
         skip_enabled_var.trace_add("write", toggle_skip)
 
+        # Parallel build (handled by the GUI, not passed to create_pdf.py)
+        # Merging the parts needs pypdf in the project venv; without it the
+        # build silently ran in one process, so say so here instead
+        cores = os.cpu_count() or 1
+        can_merge = self.engine.pdf_merge_available()
+        parallel_var = ctk.BooleanVar(value=settings["pdf_shards"] > 1 and can_merge is not False)
+        parallel_text = f"Build large decks in parallel ({cores} CPU cores)"
+        if can_merge is False:
+            parallel_text += " - unavailable: pypdf is not installed in the project venv"
+        elif can_merge is None:
+            parallel_text += " - needs pypdf in the project venv"
+        ctk.CTkCheckBox(frame, text=parallel_text, variable=parallel_var,
+                        state="disabled" if can_merge is False else "normal").pack(anchor="w", pady=4)
+        preflight_var = ctk.BooleanVar(value=settings["preflight"])
+        ctk.CTkCheckBox(frame, text="Pre-flight uploaded images (shrink to PPI, convert TIFF/EPS/...)",
+                        variable=preflight_var).pack(anchor="w", pady=4)
+
         # Custom options
         custom = CTkLabelFrame(frame, text="Custom Options")
         custom.pack(fill="x", pady=8)
@@ -1254,28 +1332,17 @@ class CardMakerGUI:
                     return
 
             result["options"] = opts
+            result["settings"] = {"pdf_shards": cores if parallel_var.get() else 1,
+                                  "preflight": preflight_var.get()}
             win.destroy()
 
         ctk.CTkButton(btns, text="Create PDF", command=on_create, width=140).pack(side="left", padx=(0,10))
         ctk.CTkButton(btns, text="Cancel", command=win.destroy, width=120).pack(side="left")
 
         win.wait_window()
-        return result["options"]
-
-    def create_pdf(self, options):
-        self.log_message("Creating PDF...")
-        cmd = [self.venv_python, "create_pdf.py"] + options
-        self.log_message(f"Command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=self.project_path)
-        if result.stdout:
-            self.log_message(f"Output: {result.stdout}")
-        if result.stderr:
-            self.log_message(f"Errors: {result.stderr}")
-        if result.returncode != 0:
-            raise Exception(f"PDF creation failed with exit code: {result.returncode}")
-
-        self.log_message("✅ PDF created successfully!")
-        pdf_file = self.find_created_pdf()
+        return result["options"], result.get("settings")
+
+    def show_pdf_result(self, pdf_file):
         if pdf_file:
             open_now = self.show_pdf_success_dialog(pdf_file)
             if open_now:
@@ -1283,21 +1350,6 @@ class CardMakerGUI:
         else:
             messagebox.showinfo("Success", "PDF has been created successfully!")
 
-    def find_created_pdf(self):
-        search_paths = [self.output_dir, self.project_path, os.path.join(self.project_path, "game")]
-        pdfs = []
-        for base in search_paths:
-            if os.path.exists(base):
-                for pattern in ("*.pdf","*.PDF"):
-                    pdfs.extend(glob.glob(os.path.join(base, pattern)))
-                    pdfs.extend(glob.glob(os.path.join(base, "**", pattern), recursive=True))
-        pdfs = list(set(pdfs))
-        if not pdfs:
-            return None
-        latest = max(pdfs, key=os.path.getmtime)
-        self.log_message(f"Most recent PDF: {latest}")
-        return latest
-
     def show_pdf_success_dialog(self, pdf_file):
         win = ctk.CTkToplevel(self.root)
         win.title("PDF Created Successfully")
@@ -1340,6 +1392,174 @@ class CardMakerGUI:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open PDF: {e}")
 
+    def show_recent_pdfs(self):
+        if not self.engine.project_path:
+            messagebox.showerror("Project Not Found",
+                                 "Could not find 'silhouette-card-maker' directory.")
+            return
+        entries = self.engine.past_pdfs()
+        if not entries:
+            messagebox.showinfo("Recent PDFs", "No PDFs have been created for this project yet.")
+            return
+
+        win = ctk.CTkToplevel(self.root)
+        win.title("Recent PDFs")
+        win.geometry("720x480")
+        win.transient(self.root)
+
+        rows = ctk.CTkScrollableFrame(win)
+        rows.pack(fill="both", expand=True, padx=15, pady=15)
+        for entry in entries:
+            row = ctk.CTkFrame(rows, corner_radius=6)
+            row.pack(fill="x", pady=2)
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["created"]))
+            details = f"{created} · {entry['size'] / 1024 ** 2:.1f} MB"
+            if entry.get("options"):
+                details += f" · {' '.join(entry['options'])}"
+            text = ctk.CTkFrame(row, fg_color="transparent")
+            text.pack(side="left", fill="x", expand=True, padx=8, pady=4)
+            ctk.CTkLabel(text, text=os.path.basename(entry["path"]), anchor="w",
+                         font=ctk.CTkFont(size=12, weight="bold")).pack(fill="x")
+            ctk.CTkLabel(text, text=details, anchor="w", font=ctk.CTkFont(size=11)).pack(fill="x")
+            ctk.CTkButton(row, text="Open", width=70,
+                          command=lambda path=entry["path"]: self.open_pdf_file(path)).pack(side="right", padx=8)
+
+    # -------------- Deck Queue --------------
+    def show_job_queue(self):
+        if not self.engine.project_path:
+            messagebox.showerror("Project Not Found",
+                                 "Could not find 'silhouette-card-maker' directory.")
+            return
+        if getattr(self, "queue_win", None) is not None and self.queue_win.winfo_exists():
+            self.queue_win.lift()
+            return
+
+        win = ctk.CTkToplevel(self.root)
+        win.title("Deck Queue")
+        win.geometry("760x640")
+        win.transient(self.root)
+        self.queue_win = win
+
+        form = CTkLabelFrame(win, text="Add Decks")
+        form.pack(fill="x", padx=15, pady=(15, 10))
+
+        rows = ctk.CTkFrame(form, fg_color="transparent")
+        rows.pack(fill="x", padx=10, pady=(0, 6))
+        ctk.CTkLabel(rows, text="Game:", font=ctk.CTkFont(size=11)).grid(row=0, column=0, sticky="w", pady=(0,6))
+        game_var = ctk.StringVar(value="Magic: The Gathering")
+        ctk.CTkComboBox(rows, variable=game_var, values=list(self.GAMES.keys()), width=240,
+                        state="readonly").grid(row=0, column=1, sticky="w", padx=(8,0), pady=(0,6))
+        ctk.CTkLabel(rows, text="Import method:", font=ctk.CTkFont(size=11)).grid(row=1, column=0, sticky="w")
+        method_var = ctk.StringVar(value="Moxfield")
+        method_combo = ctk.CTkComboBox(rows, variable=method_var, width=240, state="readonly",
+                                       values=list(self.GAMES[game_var.get()]["methods"].keys()))
+        method_combo.grid(row=1, column=1, sticky="w", padx=(8,0))
+
+        def update_methods(*_):
+            methods = list(self.GAMES[game_var.get()]["methods"].keys())
+            method_combo.configure(values=methods)
+            if method_var.get() not in methods:
+                method_var.set(methods[0] if methods else "")
+        game_var.trace_add("write", update_methods)
+
+        # Concurrency limits apply from the first deck added
+        limits = ctk.CTkFrame(form, fg_color="transparent")
+        limits.pack(fill="x", padx=10, pady=4)
+        ctk.CTkLabel(limits, text="Parallel downloads:", font=ctk.CTkFont(size=11)).pack(side="left")
+        downloads_var = ctk.StringVar(value="2")
+        downloads_entry = ctk.CTkEntry(limits, textvariable=downloads_var, width=50)
+        downloads_entry.pack(side="left", padx=(6, 20))
+        ctk.CTkLabel(limits, text="Parallel PDF builds:", font=ctk.CTkFont(size=11)).pack(side="left")
+        pdfs_var = ctk.StringVar(value="1")
+        pdfs_entry = ctk.CTkEntry(limits, textvariable=pdfs_var, width=50)
+        pdfs_entry.pack(side="left", padx=6)
+        if getattr(self, "job_queue", None) is not None:
+            downloads_entry.configure(state="disabled")
+            pdfs_entry.configure(state="disabled")
+
+        pdf_row = ctk.CTkFrame(form, fg_color="transparent")
+        pdf_row.pack(fill="x", padx=10, pady=4)
+        make_pdf_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(pdf_row, text="Create a PDF for each deck", variable=make_pdf_var).pack(side="left")
+        pdf_options = {"options": [], "settings": {"pdf_shards": 1, "preflight": False}}
+        pdf_label = ctk.CTkLabel(pdf_row, text="Default PDF options", font=ctk.CTkFont(size=11))
+
+        def choose_pdf_options():
+            options, settings = self.get_pdf_options(pdf_options["settings"])
+            if options is not None:
+                pdf_options["options"] = options
+                pdf_options["settings"] = settings
+                pdf_label.configure(text=" ".join(options) or "Default PDF options")
+        ctk.CTkButton(pdf_row, text="PDF Options...", width=120,
+                      command=choose_pdf_options).pack(side="left", padx=10)
+        pdf_label.pack(side="left")
+
+        job_list = ctk.CTkScrollableFrame(win)
+        job_list.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+        self._job_rows = {}
+
+        def add_row(job):
+            row = ctk.CTkFrame(job_list, corner_radius=6)
+            row.pack(fill="x", pady=2)
+            ctk.CTkLabel(row, text=f"#{job.job_id} {job.name}", anchor="w", width=300,
+                         font=ctk.CTkFont(size=12)).pack(side="left", padx=8)
+            ctk.CTkLabel(row, text=f"{job.game_dir} · {job.source}",
+                         font=ctk.CTkFont(size=11)).pack(side="left", padx=8)
+            state = ctk.CTkLabel(row, text=job.state, font=ctk.CTkFont(size=12, weight="bold"))
+            state.pack(side="right", padx=8)
+            self._job_rows[job.job_id] = state
+
+        existing = self.job_queue.jobs if getattr(self, "job_queue", None) is not None else []
+        for job in existing:
+            add_row(job)
+            self.update_job_row(job)
+
+        def add_decklists():
+            files = filedialog.askopenfilenames(
+                title="Select Decklist Files",
+                filetypes=[("Text files", "*.txt *.ydk *.dec"), ("All files", "*.*")],
+                parent=win)
+            if not files:
+                return
+            if getattr(self, "job_queue", None) is None:
+                try:
+                    download_limit = max(1, int(downloads_var.get()))
+                    pdf_limit = max(1, int(pdfs_var.get()))
+                except ValueError:
+                    messagebox.showerror("Error", "Concurrency limits must be whole numbers", parent=win)
+                    return
+                self.job_queue = JobQueue(
+                    self.engine, download_limit=download_limit, pdf_limit=pdf_limit,
+                    on_change=lambda job: self.root.after(0, lambda: self.update_job_row(job)))
+                downloads_entry.configure(state="disabled")
+                pdfs_entry.configure(state="disabled")
+
+            game = self.GAMES[game_var.get()]
+            source = game["methods"][method_var.get()]
+            for path in files:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        content = f.read().strip()
+                except OSError as e:
+                    self.log_message(f"Warning: Could not read {path}: {e}")
+                    continue
+                name = os.path.splitext(os.path.basename(path))[0]
+                options = list(pdf_options["options"]) if make_pdf_var.get() else None
+                job = self.job_queue.add(name, game["dir"], source, content, options,
+                                         dict(pdf_options["settings"]))
+                add_row(job)
+                self.log_message(f"Queued deck #{job.job_id}: {name}")
+
+        ctk.CTkButton(form, text="📝 Add Decklist Files...", command=add_decklists).pack(pady=(6, 10))
+
+    def update_job_row(self, job):
+        label = getattr(self, "_job_rows", {}).get(job.job_id)
+        if label is None or not label.winfo_exists():
+            return
+        colors = {"done": "green", "failed": "red"}
+        text = job.state if not job.error else f"failed: {job.error}"[:60]
+        label.configure(text=text, text_color=colors.get(job.state, ("gray10", "gray90")))
+
     # -------------- Reset --------------
     def reset_workflow(self):
         self.progress_bar.set(0)
@@ -0,0 +1,310 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Hot paths of the GUI, timed one at a time on synthetic decks:
+#
+#   python benchmarks/bench_hot_paths.py                      # 50, 500 and 5000 images
+#   python benchmarks/bench_hot_paths.py --sizes 50 500 --output before.json
+#
+# Results go to stdout (or --output) as JSON; a readable table goes to stderr.
+# Everything runs in a scratch directory with SCM_GUI_DATA_DIR pointed inside
+# it, so the real image store, caches and logs are never touched.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Written in rotation; all of them are in SUPPORTED_IMAGE_EXTENSIONS
+DECK_FORMATS = [(".png", "PNG"), (".jpg", "JPEG"), (".webp", "WEBP"), (".bmp", "BMP"),
+                (".tiff", "TIFF"), (".gif", "GIF"), (".jpeg", "JPEG"), (".tga", "TGA")]
+LOG_MESSAGES_PER_IMAGE = 20
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time the GUI's hot paths on synthetic card image decks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000],
+                        help="Deck sizes in images (default: 50 500 5000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--image-size", default="250x350",
+                        help="WIDTHxHEIGHT of the generated images (default: 250x350)")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="Run only these benchmarks")
+    parser.add_argument("--workdir", help="Keep generated decks here and reuse them on the next run")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+    try:
+        width, height = (int(v) for v in args.image_size.lower().split("x"))
+    except ValueError:
+        parser.error("--image-size must look like 250x350")
+    args.image_size = (width, height)
+    if args.repeat < 1 or any(size < 1 for size in args.sizes):
+        parser.error("--repeat and --sizes must be >= 1")
+    return args
+
+
+def make_deck(directory, count, size):
+    # count distinct images (so deduplication never kicks in) in mixed formats.
+    # A deck that is already complete is reused.
+    from PIL import Image, ImageDraw, ImageFilter
+
+    marker = os.path.join(directory, ".complete")
+    if os.path.exists(marker):
+        with open(marker, "r", encoding="utf-8") as f:
+            if json.load(f) == {"count": count, "size": list(size)}:
+                return
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    # Blurred noise compresses about like card art; each card adds its own marks
+    base = Image.merge("RGB", [Image.effect_noise(size, 60 + 20 * band) for band in range(3)])
+    base = base.filter(ImageFilter.GaussianBlur(2))
+    for i in range(count):
+        img = base.copy()
+        draw = ImageDraw.Draw(img)
+        draw.rectangle([10, 10, size[0] - 10, 40], fill=(i * 37 % 256, i * 91 % 256, i * 53 % 256))
+        draw.text((16, 18), f"card {i:05d}", fill=(255, 255, 255))
+        ext, fmt = DECK_FORMATS[i % len(DECK_FORMATS)]
+        if fmt == "GIF":
+            img = img.convert("P")
+        img.save(os.path.join(directory, f"card_{i:05d}{ext}"), fmt)
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump({"count": count, "size": list(size)}, f)
+
+
+def time_runs(repeat, setup, run):
+    # Seconds of each run(state); setup() is called untimed before every run
+    runs = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+# Each benchmark takes (core, engine, deck, count, scratch, repeat) and
+# returns (items processed per run, [seconds per run])
+def bench_index_cold(core, engine, deck, count, scratch, repeat):
+    return count, time_runs(repeat, engine.image_index.invalidate,
+                            lambda _: engine.get_all_image_files_in_directory(deck))
+
+
+def bench_index_warm(core, engine, deck, count, scratch, repeat):
+    engine.get_all_image_files_in_directory(deck)
+    return count, time_runs(repeat, lambda: None, lambda _: engine.get_all_image_files_in_directory(deck))
+
+
+def _bench_import(core, engine, deck, count, scratch, repeat, hardlinks):
+    files = [os.path.join(deck, name) for name in sorted(os.listdir(deck)) if not name.startswith(".")]
+    destination = os.path.join(scratch, "import")
+
+    def setup():
+        shutil.rmtree(destination, ignore_errors=True)
+        os.makedirs(destination)
+        engine.imported_digests.clear()
+
+    saved = core.IMPORT_HARDLINKS
+    core.IMPORT_HARDLINKS = hardlinks
+    try:
+        return count, time_runs(repeat, setup, lambda _: engine.copy_files_to_directory(files, destination))
+    finally:
+        core.IMPORT_HARDLINKS = saved
+        shutil.rmtree(destination, ignore_errors=True)
+
+
+def bench_import(core, engine, deck, count, scratch, repeat):
+    # copy_files_to_directory as configured (reflink/hardlink, then copy)
+    return _bench_import(core, engine, deck, count, scratch, repeat, hardlinks=True)
+
+
+def bench_import_copy(core, engine, deck, count, scratch, repeat):
+    return _bench_import(core, engine, deck, count, scratch, repeat, hardlinks=False)
+
+
+def _bench_thumbnails(core, deck, count, scratch, repeat, warm):
+    # What load_thumbnails sets up: a ThumbnailLoader backed by the disk cache,
+    # here asked for every tile at once and drained like the Tk poller does
+    if core.Image is None:
+        return None
+    files = [entry.path for entry in core.ImageIndex(core.SUPPORTED_IMAGE_EXTENSIONS).scan(deck)]
+    cache_dir = os.path.join(scratch, "thumbnails")
+
+    def load_all(cache):
+        loader = core.ThumbnailLoader(cache=cache)
+        try:
+            for i, path in enumerate(files):
+                loader.request(i, path)
+            for _ in files:
+                _, _, error = loader.results.get(timeout=60)
+                if error is not None:
+                    raise error
+        finally:
+            loader.close()
+
+    def setup():
+        if not warm:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        return core.ThumbnailDiskCache(cache_dir)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    if warm:
+        load_all(core.ThumbnailDiskCache(cache_dir))
+    try:
+        return count, time_runs(repeat, setup, load_all)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bench_thumbnails_cold(core, engine, deck, count, scratch, repeat):
+    return _bench_thumbnails(core, deck, count, scratch, repeat, warm=False)
+
+
+def bench_thumbnails_warm(core, engine, deck, count, scratch, repeat):
+    return _bench_thumbnails(core, deck, count, scratch, repeat, warm=True)
+
+
+def bench_log_message(core, engine, deck, count, scratch, repeat):
+    # LogPipeline.write from a worker thread's point of view, plus the drains
+    # the Tk thread does; the rotating log file is written as usual
+    messages = count * LOG_MESSAGES_PER_IMAGE
+    log = core.LogPipeline(log_file=os.path.join(scratch, "logs", "bench.log"))
+
+    def run(_):
+        for i in range(messages):
+            log.write(f"pip: Collecting package-{i} (from -r requirements.txt (line {i % 40}))")
+        while log.drain():
+            pass
+
+    return messages, time_runs(repeat, lambda: None, run)
+
+
+def bench_locate_pdf(core, engine, deck, count, scratch, repeat):
+    # Snapshot before the build plus locate_created_pdf after it, with one
+    # older PDF per image in game/output and no path printed by create_pdf.py
+    # (the slowest case: the folders are compared)
+    project = os.path.join(scratch, "project")
+    output = os.path.join(project, "game", "output")
+    shutil.rmtree(project, ignore_errors=True)
+    os.makedirs(output)
+    for i in range(count):
+        with open(os.path.join(output, f"old_{i:05d}.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4\n")
+    engine.set_project_directory(project)
+    search_dirs = engine.pdf_search_dirs([])
+    new_pdf = os.path.join(output, "game.pdf")
+
+    def setup():
+        if os.path.exists(new_pdf):
+            os.remove(new_pdf)
+
+    def run(_):
+        before = core.snapshot_pdfs(search_dirs)
+        with open(new_pdf, "wb") as f:  # what create_pdf.py would write
+            f.write(b"%PDF-1.4\n")
+        found = engine.locate_created_pdf([], search_dirs, before, [])
+        if found != new_pdf:
+            raise RuntimeError(f"located {found} instead of {new_pdf}")
+
+    try:
+        return count, time_runs(repeat, setup, run)
+    finally:
+        shutil.rmtree(project, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "index_cold": bench_index_cold,
+    "index_warm": bench_index_warm,
+    "import": bench_import,
+    "import_copy": bench_import_copy,
+    "thumbnails_cold": bench_thumbnails_cold,
+    "thumbnails_warm": bench_thumbnails_warm,
+    "log_message": bench_log_message,
+    "locate_pdf": bench_locate_pdf,
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = args.only or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}. Choose from: {', '.join(BENCHMARKS)}",
+              file=sys.stderr)
+        return 2
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="scm-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    # Must be set before card_maker_core is imported: its paths are read at import
+    os.environ["SCM_GUI_DATA_DIR"] = os.path.join(workdir, "gui-data")
+    import card_maker_core as core
+
+    if core.Image is None:
+        print("Pillow is required to generate the decks", file=sys.stderr)
+        return 2
+
+    results = []
+    try:
+        for count in args.sizes:
+            deck = os.path.join(workdir, f"deck-{count}")
+            print(f"Preparing {count} images...", file=sys.stderr)
+            make_deck(deck, count, args.image_size)
+            deck_bytes = sum(entry.stat().st_size for entry in os.scandir(deck))
+            for name in names:
+                scratch = tempfile.mkdtemp(prefix=f"{name}-", dir=workdir)
+                engine = core.WorkflowEngine()
+                try:
+                    outcome = BENCHMARKS[name](core, engine, deck, count, scratch, args.repeat)
+                finally:
+                    engine.close_pdf_worker()
+                    shutil.rmtree(scratch, ignore_errors=True)
+                if outcome is None:
+                    continue
+                items, runs = outcome
+                best = min(runs)
+                result = {"benchmark": name, "images": count, "deck_mb": round(deck_bytes / 1024 ** 2, 1),
+                          "items": items, "runs_s": [round(r, 6) for r in runs],
+                          "best_s": round(best, 6), "median_s": round(statistics.median(runs), 6),
+                          "items_per_s": round(items / best, 1) if best > 0 else None}
+                results.append(result)
+                print(f"  {name:<16} {count:>6} images  best {best * 1000:>10.2f} ms  "
+                      f"{result['items_per_s'] or 0:>12,.0f} items/s", file=sys.stderr)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "image_size": list(args.image_size),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
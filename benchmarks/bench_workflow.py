@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import platform
+import shlex
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# End-to-end baseline: all seven steps, headless, against the mock project in
+# mock_project.py, with per-step latency taken from the engine's trace.
+#
+#   python benchmarks/bench_workflow.py --cards 200 --repeat 3 --output workflow.json
+#
+# Run 1 creates the venv (cold); later runs reuse it unless --cold is given.
+# Like a real plugin, the mock fetch.py writes every image; with
+# --skip-existing it keeps the ones the image store put back instead.
+# Nothing outside the scratch directory is touched.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from mock_project import MOCK_GAME, MOCK_SOURCE, create_mock_project, mock_decklist  # noqa: E402
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the whole workflow against a mock project and time each step.")
+    parser.add_argument("--cards", type=int, default=200, help="Cards in the mock decklist (default: 200)")
+    parser.add_argument("--repeat", type=int, default=3, help="Workflow runs (default: 3)")
+    parser.add_argument("--fetch-rate", type=float, default=50.0, help="Mock download images/s, 0 = unthrottled")
+    parser.add_argument("--pdf-cpu-ms", type=float, default=20, help="Mock create_pdf.py CPU ms per card")
+    parser.add_argument("--pdf-memory-mb", type=int, default=100, help="Memory the mock create_pdf.py holds")
+    parser.add_argument("--pdf-args", default="", help="Options passed to create_pdf.py, e.g. '--ppi 300'")
+    parser.add_argument("--parallel", type=int, default=1, metavar="N", help="Split the PDF across N processes")
+    parser.add_argument("--no-worker", action="store_true", help="Run create_pdf.py fresh instead of the warm worker")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="Mock fetch.py keeps images already present, and the image store prefills them")
+    parser.add_argument("--cold", action="store_true",
+                        help="Fresh venv, image store and caches for every run")
+    parser.add_argument("--workdir", help="Scratch directory to use and keep (default: a temporary one)")
+    parser.add_argument("--verbose", action="store_true", help="Print the workflow log to stderr")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+    if args.cards < 1 or args.repeat < 1 or args.parallel < 1:
+        parser.error("--cards, --repeat and --parallel must be >= 1")
+    return args
+
+
+def run_once(args, data_dir, project):
+    # card_maker_core reads SCM_GUI_DATA_DIR at import, so every run in this
+    # process uses data_dir (--cold empties it between runs)
+    import card_maker_core as core
+
+    if args.skip_existing:
+        core.IMAGE_STORE_PREFILL_PLUGINS.add(f"{MOCK_GAME}/{MOCK_SOURCE}")
+    log = core.LogPipeline(log_file=os.path.join(data_dir, "logs", "gui.log"),
+                           echo=sys.stderr if args.verbose else None)
+    engine = core.WorkflowEngine(log=log.write)
+    engine.use_pdf_worker = engine.use_pdf_worker and not args.no_worker
+    engine.pdf_shards = args.parallel
+    error = None
+    start = time.perf_counter()
+    try:
+        if not engine.validate_project_directory(project):
+            raise Exception(f"{project} is not a valid project folder")
+        engine.set_project_directory(project)
+        engine.prepare()
+        engine.use_decklist(mock_decklist(args.cards), MOCK_GAME, MOCK_SOURCE)
+        engine.execute_step_6()
+        pdf_file = engine.create_pdf(shlex.split(args.pdf_args))
+        if not pdf_file:
+            raise Exception("The PDF could not be located")
+    except Exception as e:
+        error = str(e)
+    total = time.perf_counter() - start
+    processes = list(engine.process_records)
+    engine.finish_run()
+    engine.close_pdf_worker()
+    if not args.verbose:
+        log.drain(limit=10 ** 9)
+    steps = {s["name"]: round(s["wall"], 4) for s in engine.tracer.spans if s["cat"] == "step"}
+    return {"total_s": round(total, 4), "steps": steps, "processes": processes, "error": error}
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="scm-workflow-")
+    os.makedirs(workdir, exist_ok=True)
+    project = os.path.join(workdir, "silhouette-card-maker-mock")
+    create_mock_project(project, fetch_rate=args.fetch_rate, pdf_cpu_ms_per_card=args.pdf_cpu_ms,
+                        pdf_memory_mb=args.pdf_memory_mb, skip_existing=args.skip_existing)
+    data_dir = os.path.join(workdir, "gui-data")
+    # Must be set before card_maker_core is imported: its paths are read at import
+    os.environ["SCM_GUI_DATA_DIR"] = data_dir
+
+    runs = []
+    try:
+        for i in range(1, args.repeat + 1):
+            if args.cold:
+                shutil.rmtree(data_dir, ignore_errors=True)
+                shutil.rmtree(os.path.join(project, ".gui_cache"), ignore_errors=True)
+            result = run_once(args, data_dir, project)
+            result["run"] = i
+            result["cold"] = args.cold or i == 1
+            runs.append(result)
+            status = f"failed: {result['error']}" if result["error"] else "ok"
+            print(f"Run {i}: {result['total_s']:.2f}s ({status})", file=sys.stderr)
+            for name, seconds in result["steps"].items():
+                print(f"  {name:<42} {seconds:>8.3f}s", file=sys.stderr)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    # Per-step medians over the warm runs (all runs when there are none)
+    warm = [r for r in runs if not r["cold"] and not r["error"]] or [r for r in runs if not r["error"]]
+    names = sorted({name for r in warm for name in r["steps"]})
+    summary = {name: round(statistics.median(r["steps"][name] for r in warm if name in r["steps"]), 4)
+               for name in names}
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {"cards": args.cards, "fetch_rate": args.fetch_rate, "pdf_cpu_ms": args.pdf_cpu_ms,
+                   "pdf_memory_mb": args.pdf_memory_mb, "pdf_args": args.pdf_args,
+                   "parallel": args.parallel, "pdf_worker": not args.no_worker, "cold": args.cold,
+                   "skip_existing": args.skip_existing},
+        "median_steps_s": summary,
+        "runs": runs,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    return 1 if any(r["error"] for r in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import json
+import os
+
+# A stand-in for the silhouette-card-maker project folder that passes
+# WorkflowEngine.validate_project_directory and needs no network: the fetch
+# plugin draws its images locally and create_pdf.py writes a bare PDF. How
+# long they take is set in mock_config.json, which both stubs read on every
+# run, so one fixture can be re-tuned without rebuilding it.
+#
+#   python benchmarks/mock_project.py /tmp/mock-scm --fetch-rate 20 --pdf-cpu-ms 50
+#
+# Both stubs only use the standard library, so requirements.txt stays empty
+# and pip never leaves the machine.
+
+MOCK_GAME = "mtg"
+MOCK_SOURCE = "moxfield"
+CONFIG_FILE = "mock_config.json"
+
+DEFAULT_CONFIG = {
+    "fetch_rate": 50.0,          # images per second; 0 = as fast as possible
+    "image_size": [250, 350],
+    "double_sided_every": 0,     # every Nth card also gets a back; 0 = none
+    "pdf_cpu_ms_per_card": 20,   # busy CPU time per card in create_pdf.py
+    "pdf_memory_mb": 100,        # held (and touched) for the whole PDF build
+    "cards_per_sheet": 9,
+    "skip_existing": False,      # keep images already in game/; real plugins rewrite them
+}
+
+FETCH_SCRIPT = r'''import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+# Mock fetch.py: one PNG per card copy in the decklist, at fetch_rate images/s.
+# Every image is written, even if it exists, unless skip_existing is set.
+
+
+def png(width, height, seed):
+    rows = []
+    for y in range(height):
+        color = bytes(((seed * 37 + y) % 256, (seed * 91) % 256, (seed * 13 + y * 3) % 256))
+        rows.append(b"\x00" + color * width)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + chunk(b"IEND", b""))
+
+
+def main():
+    with open("mock_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    cards = []
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            count, _, name = line.partition(" ")
+            if not count.isdigit():
+                count, name = "1", line
+            cards.extend(name if copy == 0 else f"{name} ({copy + 1})" for copy in range(int(count)))
+
+    width, height = config["image_size"]
+    rate = config["fetch_rate"]
+    every = config["double_sided_every"]
+    skip_existing = config.get("skip_existing", False)
+    start = time.monotonic()
+    for i, name in enumerate(cards, 1):
+        targets = ["game/front"] + (["game/double_sided"] if every and i % every == 0 else [])
+        for folder in targets:
+            path = os.path.join(folder, name + ".png")
+            if skip_existing and os.path.exists(path):
+                continue
+            with open(path + ".part", "wb") as out:
+                out.write(png(width, height, i))
+            os.replace(path + ".part", path)
+        print(f"Downloaded {i}/{len(cards)}: {name}", flush=True)
+        if rate:
+            delay = start + i / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+CREATE_PDF_SCRIPT = r'''import argparse
+import hashlib
+import json
+import math
+import os
+import time
+
+# Mock create_pdf.py: costs pdf_cpu_ms_per_card of CPU per card and holds
+# pdf_memory_mb of memory, then writes a PDF of blank sheets
+
+
+def burn(seconds):
+    end = time.process_time() + seconds
+    block = b"x" * 65536
+    while time.process_time() < end:
+        block = hashlib.sha256(block).digest() * 2048
+
+
+def write_pdf(path, pages):
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               "<< /Type /Pages /Kids [%s] /Count %d >>"
+               % (" ".join(f"{3 + i} 0 R" for i in range(pages)), pages)]
+    objects += ["<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>"] * pages
+    out, offsets = [b"%PDF-1.4\n"], []
+    for number, body in enumerate(objects, 1):
+        offsets.append(sum(len(part) for part in out))
+        out.append(f"{number} 0 obj\n{body}\nendobj\n".encode("ascii"))
+    xref = sum(len(part) for part in out)
+    out.append(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii"))
+    out += [f"{offset:010d} 00000 n \n".encode("ascii") for offset in offsets]
+    out.append(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+               .encode("ascii"))
+    with open(path, "wb") as f:
+        f.write(b"".join(out))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--front_dir_path", default="game/front")
+    parser.add_argument("--output_path", default="game/output/game.pdf")
+    parser.add_argument("--skip", type=int, action="append", default=[])
+    args, _ = parser.parse_known_args(argv)  # every other real option is accepted and ignored
+    with open("mock_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    held = bytearray(config["pdf_memory_mb"] * 1024 * 1024)
+    for i in range(0, len(held), 4096):
+        held[i] = 1
+    fronts = sorted(os.listdir(args.front_dir_path))
+    per_sheet = max(1, config["cards_per_sheet"] - len(set(args.skip)))
+    sheets = max(1, math.ceil(len(fronts) / per_sheet))
+    for done in range(1, len(fronts) + 1):
+        burn(config["pdf_cpu_ms_per_card"] / 1000)
+        if done % per_sheet == 0 or done == len(fronts):
+            print(f"Sheet {math.ceil(done / per_sheet)}/{sheets}", flush=True)
+    os.makedirs(os.path.dirname(args.output_path) or ".", exist_ok=True)
+    write_pdf(args.output_path, sheets)
+    print(f"Wrote {args.output_path}")
+    del held
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+def create_mock_project(path, **config):
+    # (Re)writes the fixture at path; config overrides DEFAULT_CONFIG keys.
+    # Existing images in game/ are left for the workflow's own cleanup step.
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown mock settings: {', '.join(sorted(unknown))}")
+    for folder in ("front", "double_sided", "decklist", "output"):
+        os.makedirs(os.path.join(path, "game", folder), exist_ok=True)
+    os.makedirs(os.path.join(path, "plugins", MOCK_GAME), exist_ok=True)
+    os.makedirs(os.path.join(path, "assets"), exist_ok=True)
+    files = {
+        os.path.join("plugins", MOCK_GAME, "fetch.py"): FETCH_SCRIPT,
+        "create_pdf.py": CREATE_PDF_SCRIPT,
+        "requirements.txt": "# the mock project has no dependencies\n",
+        CONFIG_FILE: json.dumps(dict(DEFAULT_CONFIG, **config), indent=1) + "\n",
+    }
+    per_side = int(round(dict(DEFAULT_CONFIG, **config)["cards_per_sheet"] ** 0.5)) or 1
+    # Lets sharded builds split the deck into whole sheets
+    layout = {"x_pos": list(range(per_side)), "y_pos": list(range(per_side))}
+    files[os.path.join("assets", "layouts.json")] = json.dumps(
+        {"paper_layouts": {"letter": {"card_layouts": {"standard": layout}}}}, indent=1) + "\n"
+    for name, content in files.items():
+        with open(os.path.join(path, name), "w", encoding="utf-8") as f:
+            f.write(content)
+    return path
+
+
+def mock_decklist(cards):
+    # One distinct card per line, named like the images fetch.py writes
+    return "".join(f"1 Mock Card {i:05d}\n" for i in range(1, cards + 1))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a mock silhouette-card-maker project folder.")
+    parser.add_argument("path")
+    parser.add_argument("--fetch-rate", type=float, help="Images per second (0 = unthrottled)")
+    parser.add_argument("--pdf-cpu-ms", type=float, help="create_pdf.py CPU milliseconds per card")
+    parser.add_argument("--pdf-memory-mb", type=int, help="Memory create_pdf.py holds while it runs")
+    parser.add_argument("--double-sided-every", type=int, help="Every Nth card also gets a back")
+    parser.add_argument("--skip-existing", action="store_true", default=None,
+                        help="Do not rewrite images that are already in game/")
+    cli = parser.parse_args()
+    settings = {"fetch_rate": cli.fetch_rate, "pdf_cpu_ms_per_card": cli.pdf_cpu_ms,
+                "pdf_memory_mb": cli.pdf_memory_mb, "double_sided_every": cli.double_sided_every,
+                "skip_existing": cli.skip_existing}
+    create_mock_project(cli.path, **{k: v for k, v in settings.items() if v is not None})
+    print(f"Mock project written to {cli.path} (game '{MOCK_GAME}', source '{MOCK_SOURCE}')")
@@ -0,0 +1,2981 @@
+import subprocess
+import sys
+import os
+import threading
+import queue
+import time
+import glob
+import shutil
+import json
+import hashlib
+import re
+import logging
+import logging.handlers
+import selectors
+import math
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from collections import deque, namedtuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflinks
+    fcntl = None
+
+try:
+    from PIL import Image
+except ImportError:  # only thumbnails need Pillow; headless runs work without it
+    Image = None
+
+# -----------------------------
+# Project configuration
+# -----------------------------
+PROJECT_FOLDER_NAME = "silhouette-card-maker-1.4.0"
+PROJECT_VERSION = PROJECT_FOLDER_NAME.split("-")[-1]
+
+# Per-user data shared by every project version (caches, stores)
+GUI_DATA_DIR = os.environ.get("SCM_GUI_DATA_DIR") or os.path.join(
+    os.path.expanduser("~"), ".silhouette-card-maker-gui")
+
+# Known project folders by version; startup validates these instead of scanning
+PROJECT_LOCATIONS_FILE = os.path.join(GUI_DATA_DIR, "project_locations.json")
+
+# Downloaded card images are kept here between runs (LRU-capped)
+IMAGE_STORE_DIR = os.path.join(GUI_DATA_DIR, "image_store")
+IMAGE_STORE_MAX_BYTES = 2 * 1024 ** 3
+# "<game>/<source>" plugins whose fetch.py skips cards that already have an
+# image. Only their downloads are stored, and put back before they run: the
+# others download every card anyway, so a stored copy would never be used
+# (and a prefilled one would be printed twice).
+IMAGE_STORE_PREFILL_PLUGINS = set()
+
+# Full log is written here (rotated)
+LOG_FILE = os.path.join(GUI_DATA_DIR, "logs", "gui.log")
+
+# Chrome/Perfetto traces of each run (the newest TRACE_KEEP are kept)
+TRACE_DIR = os.path.join(GUI_DATA_DIR, "traces")
+TRACE_KEEP = 50
+
+# One JSON line per run: step times and each subprocess's memory, CPU and I/O
+RUN_HISTORY_FILE = os.path.join(GUI_DATA_DIR, "run_history.jsonl")
+RUN_HISTORY_MAX_BYTES = 5 * 1024 ** 2
+# How often running subprocesses are sampled in /proc (Linux)
+PROC_SAMPLE_INTERVAL = 0.25
+
+# venv bootstrap: requirements are built once into a shared wheelhouse and
+# installed with --no-index, so new project versions and offline machines do
+# not need PyPI. uv is used for venv creation and installs when it is on PATH.
+USE_WHEELHOUSE = True
+# Project folders whose requirements.txt and Python version match share one venv
+USE_SHARED_VENVS = True
+SHARED_VENV_DIR = os.path.join(GUI_DATA_DIR, "venvs")
+WHEELHOUSE_DIR = os.path.join(GUI_DATA_DIR, "wheelhouse")
+PIP_CACHE_DIR = os.path.join(GUI_DATA_DIR, "pip-cache")
+
+# Repeated PDFs go through a warm create_pdf.py worker (pdf_worker.py) instead
+# of a new interpreter per run
+USE_PDF_WORKER = True
+PDF_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdf_worker.py")
+
+# Uploaded images on the same filesystem are hardlinked into game/front
+# instead of copied (reflinks are always tried first)
+IMPORT_HARDLINKS = True
+
+# Byte-identical uploads are stored once (hardlinked to the first copy)
+DEDUPE_IMPORTS = True
+# Look-alike images (dHash within this many of 64 bits) are reported in the
+# preview; 0 turns the check off
+NEAR_DUPLICATE_DISTANCE = 6
+
+# Bounding box of preview thumbnails
+THUMBNAIL_SIZE = (220, 300)
+# Decoded thumbnails are cached on disk under <project>/.gui_cache/thumbnails
+THUMBNAIL_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# Optional pre-flight before step 7: uploaded images are downscaled to the
+# PDF's PPI and converted to PNG/JPEG, cached by content hash
+PREFLIGHT_CACHE_DIR = os.path.join(GUI_DATA_DIR, "preflight")
+PREFLIGHT_CACHE_MAX_BYTES = 1024 ** 3
+
+# Centralized game -> method mapping.
+# Each game has a 'dir' used for plugin folder, and a set of human-friendly method labels mapping to 'source' strings.
+GAMES = {
+    "Magic: The Gathering": {
+        "dir": "mtg",
+        "methods": {
+            "Moxfield": "moxfield",
+            "MTGA": "mtga",
+            "MTGO": "mtgo",
+            "Archidekt": "archidekt",
+            "Deckstats": "deckstats",
+            "Scryfall": "scryfall",
+        },
+    },
+    "Riftbound": {
+        "dir": "riftbound",
+        "methods": {
+            "Pixelborn": "pixelborn",
+            "TTS": "tts",
+            "Piltover": "piltover_archive",
+        },
+    },
+    "Yu-Gi-Oh!": {
+        "dir": "yugioh",
+        "methods": {
+            "YDK": "ydk",
+            "YDKE": "ydke",
+        },
+    },
+    "Lorcana": {
+        "dir": "lorcana",
+        "methods": {
+            "Dreamborn": "dreamborn",
+        },
+    },
+    "Netrunner": {
+        "dir": "netrunner",
+        "methods": {
+            "Jinteki": "jinteki",
+            "bbCode": "bbcode",
+            "Markdown(Reddit)": "markdown",
+            "Text": "text",
+            "Plain Text": "plain_text",
+        },
+    },
+    "Altered": {
+        "dir": "altered",
+        "methods": {
+            "Ajordat": "ajordat",
+        },
+    },
+}
+
+# Supported image extensions (Pillow capable)
+SUPPORTED_IMAGE_EXTENSIONS = {
+    ".png",".jpg",".jpeg",".gif",".bmp",".tiff",".tif",
+    ".webp",".ico",".ppm",".pgm",".pbm",".pnm",".pcx",
+    ".dib",".eps",".ps",".pdf",".sgi",".tga",".xbm",".xpm"
+}
+
+
+# -----------------------------
+# Helper: thread-safe log pipeline
+# -----------------------------
+class LogPipeline:
+    # Any thread may write(); lines are queued for the UI to drain in batches
+    # and streamed to a rotating log file as they arrive. With echo (a text
+    # stream, for headless runs) lines are printed instead of queued.
+    def __init__(self, log_file=LOG_FILE, max_bytes=5 * 1024 ** 2, backups=3, echo=None):
+        self.queue = queue.SimpleQueue()
+        self.echo = echo
+        self._echo_lock = threading.Lock()
+        self.logger = logging.getLogger("silhouette_card_maker_gui")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if log_file and not self.logger.handlers:
+            try:
+                os.makedirs(os.path.dirname(log_file), exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self.logger.addHandler(handler)
+            except OSError:
+                pass
+
+    def write(self, message):
+        timestamp = time.strftime("%H:%M:%S")
+        line = f"[{timestamp}] {message}\n"
+        if self.echo is not None:
+            with self._echo_lock:
+                self.echo.write(line)
+                self.echo.flush()
+        else:
+            self.queue.put(line)
+        self.logger.info(message)
+
+    def drain(self, limit=1000):
+        lines = []
+        while len(lines) < limit:
+            try:
+                lines.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return lines
+
+
+# -----------------------------
+# Helper: tracing
+# -----------------------------
+class Tracer:
+    # Records timed spans from any thread: wall time, CPU time (the calling
+    # thread's, or the child's for subprocesses) and an item count. Exported
+    # as Chrome trace JSON (chrome://tracing, ui.perfetto.dev) and summarised
+    # per (category, name) for the log.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+            self.origin = time.perf_counter()
+            self.started_at = time.time()
+
+    @contextlib.contextmanager
+    def span(self, name, category, items=None, **args):
+        # The yielded dict can be updated in the block (items, extra args)
+        record = {"items": items, "args": args}
+        start, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield record
+        finally:
+            self.add(name, category, start, time.perf_counter() - start,
+                     time.thread_time() - cpu, record["items"], **record["args"])
+
+    def add(self, name, category, start, wall, cpu=None, items=None, **args):
+        # start is a time.perf_counter() value
+        thread = threading.current_thread()
+        with self._lock:
+            self.spans.append({"name": name, "cat": category, "start": start - self.origin,
+                               "wall": wall, "cpu": cpu, "items": items, "args": args,
+                               "tid": thread.ident, "thread": thread.name})
+
+    def export_chrome(self, path):
+        with self._lock:
+            spans = list(self.spans)
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in {(s["tid"], s["thread"]) for s in spans}]
+        for s in spans:
+            args = {key: str(value) for key, value in s["args"].items()}
+            if s["cpu"] is not None:
+                args["cpu_ms"] = round(s["cpu"] * 1000, 3)
+            if s["items"] is not None:
+                args["items"] = s["items"]
+            events.append({"name": s["name"], "cat": s["cat"], "ph": "X", "pid": pid, "tid": s["tid"],
+                           "ts": round(s["start"] * 1e6), "dur": round(s["wall"] * 1e6), "args": args})
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def summary_lines(self):
+        # One row per (category, name), slowest first
+        totals = {}
+        with self._lock:
+            for s in self.spans:
+                row = totals.setdefault((s["cat"], s["name"]), [0, 0.0, None, None])
+                row[0] += 1
+                row[1] += s["wall"]
+                if s["cpu"] is not None:
+                    row[2] = (row[2] or 0.0) + s["cpu"]
+                if s["items"] is not None:
+                    row[3] = (row[3] or 0) + s["items"]
+        lines = [f"{'category':<12} {'span':<40} {'count':>5} {'wall s':>8} {'cpu s':>8} {'items':>7}"]
+        for (category, name), (count, wall, cpu, items) in sorted(totals.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{category:<12} {name[:40]:<40} {count:>5} {wall:>8.2f} "
+                         f"{'-' if cpu is None else f'{cpu:.2f}':>8} {'-' if items is None else items:>7}")
+        return lines
+
+
+# -----------------------------
+# Helper: resource accounting
+# -----------------------------
+# Peak memory, CPU seconds and bytes read/written by a subprocess (including
+# the processes it started). Fields are None where the platform cannot tell.
+ResourceUsage = namedtuple("ResourceUsage", "peak_rss user system read_bytes write_bytes")
+
+
+def _proc_fields(path, names):
+    # Integer "Name: value" fields of a /proc file; {} if it cannot be read
+    values = {}
+    try:
+        with open(path, "r", encoding="ascii", errors="replace") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in names and rest.split():
+                    values[key] = int(rest.split()[0])
+    except (OSError, ValueError):
+        pass
+    return values
+
+
+def _proc_children(pid):
+    children = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children", "r", encoding="ascii") as f:
+                children.extend(int(child) for child in f.read().split())
+    except (OSError, ValueError):
+        pass
+    return children
+
+
+def proc_cpu_times(pid):
+    # (user, system) CPU seconds of a live process from /proc/<pid>/stat
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="ascii", errors="replace") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = os.sysconf("SC_CLK_TCK")
+        return int(fields[11]) / ticks, int(fields[12]) / ticks
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class ProcessSampler:
+    # Samples a process tree in /proc while it runs (Linux only; elsewhere it
+    # records nothing). Peak RSS is the larger of the root's high-water mark
+    # and the summed RSS of the tree. I/O is rchar/wchar, i.e. bytes passed
+    # to read()/write(), so reads served from the page cache count too.
+    def __init__(self, pid, interval=PROC_SAMPLE_INTERVAL):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = None
+        self.samples = 0
+        self._io = {}  # pid -> (rchar, wchar) when last seen; exited children keep theirs
+        self._stop = threading.Event()
+        self._thread = None
+        if os.path.isdir(f"/proc/{pid}"):
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        pids, seen, total = [self.pid], set(), 0
+        while pids:
+            pid = pids.pop()
+            if pid in seen:
+                continue
+            seen.add(pid)
+            # An exited (zombie) process has no memory fields left, but its I/O counters remain
+            status = _proc_fields(f"/proc/{pid}/status", ("VmRSS", "VmHWM"))
+            total += status.get("VmRSS", 0) * 1024
+            if pid == self.pid and "VmHWM" in status:
+                self.peak_rss = max(self.peak_rss or 0, status["VmHWM"] * 1024)
+            io = _proc_fields(f"/proc/{pid}/io", ("rchar", "wchar"))
+            if io:
+                self._io[pid] = (io.get("rchar", 0), io.get("wchar", 0))
+            pids.extend(_proc_children(pid))
+        if total:
+            self.peak_rss = max(self.peak_rss or 0, total)
+            self.samples += 1
+
+    def stop(self):
+        # One last sample while the exited child is still a zombie, then stop
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+    @property
+    def read_bytes(self):
+        return sum(r for r, _ in self._io.values()) if self._io else None
+
+    @property
+    def write_bytes(self):
+        return sum(w for _, w in self._io.values()) if self._io else None
+
+
+def wait_with_rusage(process):
+    # Popen.wait() that also returns the child's struct rusage on POSIX
+    # (it covers the child and every descendant it waited for)
+    if os.name == "nt" or not hasattr(os, "wait4"):
+        return process.wait(), None
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:  # already reaped
+        return process.wait(), None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, usage
+
+
+def usage_args(usage):
+    # ResourceUsage as trace span / run history fields (MB and seconds)
+    if usage is None:
+        return {}
+    fields = {"peak_rss_mb": usage.peak_rss, "read_mb": usage.read_bytes, "write_mb": usage.write_bytes}
+    args = {key: round(value / 1024 ** 2, 1) for key, value in fields.items() if value is not None}
+    if usage.user is not None:
+        args.update(user_s=round(usage.user, 3), system_s=round(usage.system, 3))
+    return args
+
+
+def process_usage(rusage, sampler=None):
+    peak = user = system = read = written = None
+    if rusage is not None:
+        user, system = rusage.ru_utime, rusage.ru_stime
+        # ru_maxrss is in bytes on macOS, KiB elsewhere
+        peak = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024) or None
+        read, written = rusage.ru_inblock * 512, rusage.ru_oublock * 512
+    if sampler is not None and sampler.samples:
+        peak = max(peak or 0, sampler.peak_rss or 0)
+        read, written = sampler.read_bytes, sampler.write_bytes
+    return ResourceUsage(peak, user, system, read, written)
+
+
+def describe_usage(usage):
+    # "peak 812 MB RSS, CPU 12.3s user + 1.1s sys, read 300.0 MB, wrote 20.0 MB"
+    parts = []
+    if usage.peak_rss is not None:
+        parts.append(f"peak {usage.peak_rss / 1024 ** 2:.0f} MB RSS")
+    if usage.user is not None:
+        parts.append(f"CPU {usage.user:.1f}s user + {usage.system:.1f}s sys")
+    if usage.read_bytes is not None:
+        parts.append(f"read {usage.read_bytes / 1024 ** 2:.1f} MB, "
+                     f"wrote {usage.write_bytes / 1024 ** 2:.1f} MB")
+    return ", ".join(parts) or "not available on this platform"
+
+
+# -----------------------------
+# Helper: streaming subprocess runner
+# -----------------------------
+# kind is "line" (data = text), "progress" (data = (done, total)) or "exit" (data = return code)
+ProcessEvent = namedtuple("ProcessEvent", "kind stream data")
+
+# N/M only counts as progress after a progress word ("Downloaded 3/40",
+# "Sheet 2 of 5"), in a tqdm bar ("45%|####  | 9/20 [...]") or as a leading
+# "[3/40]". A bare N/M is too often something else: a 2/2 creature, a date.
+PROGRESS_RE = re.compile(
+    r"(?:\b(?:download(?:ing|ed)?|fetch(?:ing|ed)?|process(?:ing|ed)?|sav(?:ing|ed)|writing|"
+    r"render(?:ing|ed)?|sheets?|pages?|cards?|images?|files?)\b[\s:#]*|%\|[^|]*\|\s*|^\s*\[)"
+    r"(\d+)\s*(?:/|of)\s*(\d+)\b(?![/.:-]\d)",
+    re.IGNORECASE)
+
+# "\r" ends a line too, so progress bars that redraw in place come through
+LINE_END_RE = re.compile(rb"\r\n|\r|\n")
+
+
+def read_lines(pipe):
+    # Lines of a binary pipe as they arrive, split like LINE_END_RE
+    partial = b""
+    for chunk in iter(lambda: pipe.read1(65536), b""):
+        *lines, partial = LINE_END_RE.split(partial + chunk)
+        yield from lines
+    if partial:
+        yield partial
+
+
+def line_events(stream, text):
+    # "line" event for one line of output, plus "progress" if it reports N/M done
+    events = [ProcessEvent("line", stream, text)]
+    match = PROGRESS_RE.search(text)
+    if match:
+        done, total = int(match.group(1)), int(match.group(2))
+        if 0 < total and done <= total:
+            events.append(ProcessEvent("progress", stream, (done, total)))
+    return events
+
+
+class StreamingProcess:
+    # Reads stdout and stderr at the same time (selectors on POSIX, reader
+    # threads on Windows where pipes cannot be selected), so neither pipe can
+    # fill up and stall the child. Events are delivered to on_events in
+    # batches at most every flush_interval seconds.
+    def __init__(self, cmd, cwd=None, env=None, on_events=None, flush_interval=0.1,
+                 tracer=None, name=None):
+        self.cmd = cmd
+        self.cwd = cwd
+        self.env = env
+        self.on_events = on_events or (lambda events: None)
+        self.flush_interval = flush_interval
+        self.tracer = tracer              # optional Tracer; the run becomes one span
+        self.name = name or os.path.basename(str(cmd[0]))
+        self.stderr_tail = deque(maxlen=50)
+        self.returncode = None
+        self.usage = None                 # ResourceUsage once the process has exited
+        self.wall = None
+        self.lines = 0
+        self._batch = []
+        self._last_flush = 0.0
+
+    def run(self):
+        start = time.perf_counter()
+        self.process = subprocess.Popen(self.cmd, cwd=self.cwd, env=self.env,
+                                        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE)
+        sampler = ProcessSampler(self.process.pid)
+        self._last_flush = time.monotonic()
+        try:
+            if os.name == "nt":
+                self._pump_threads()
+            else:
+                self._pump_selectors()
+        finally:
+            sampler.stop()
+        self.returncode, rusage = wait_with_rusage(self.process)
+        self.wall = time.perf_counter() - start
+        self.usage = process_usage(rusage, sampler)
+        self._batch.append(ProcessEvent("exit", None, self.returncode))
+        self._flush()
+        if self.tracer is not None:
+            cpu = None if self.usage.user is None else self.usage.user + self.usage.system
+            self.tracer.add(self.name, "subprocess", start, self.wall, cpu, self.lines,
+                            pid=self.process.pid, returncode=self.returncode,
+                            cmd=" ".join(map(str, self.cmd))[:300], **usage_args(self.usage))
+        return self.returncode
+
+    def _pump_selectors(self):
+        sel = selectors.DefaultSelector()
+        partial = {}
+        for name, pipe in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            sel.register(pipe, selectors.EVENT_READ, name)
+            partial[name] = b""
+        while sel.get_map():
+            for key, _ in sel.select(timeout=self.flush_interval):
+                name = key.data
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    key.fileobj.close()
+                    if partial[name]:
+                        self._add_line(name, partial[name])
+                    continue
+                *lines, partial[name] = LINE_END_RE.split(partial[name] + chunk)
+                for line in lines:
+                    self._add_line(name, line)
+            self._maybe_flush()
+        sel.close()
+
+    def _pump_threads(self):
+        lines = queue.Queue()
+
+        def reader(name, pipe):
+            for line in read_lines(pipe):
+                lines.put((name, line))
+            pipe.close()
+            lines.put((name, None))
+
+        open_streams = 2
+        for name, pipe in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            threading.Thread(target=reader, args=(name, pipe), daemon=True).start()
+        while open_streams:
+            try:
+                name, line = lines.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_flush()
+                continue
+            if line is None:
+                open_streams -= 1
+            else:
+                self._add_line(name, line)
+            self._maybe_flush()
+
+    def _add_line(self, stream, raw):
+        text = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if not text.strip():
+            return
+        if stream == "stderr":
+            self.stderr_tail.append(text)
+        self.lines += 1
+        self._batch.extend(line_events(stream, text))
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush()
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self.on_events(batch)
+
+
+# -----------------------------
+# Helper: progress reporting
+# -----------------------------
+# fraction and eta are None while the total (or the rate) is unknown; rate is items/s
+Progress = namedtuple("Progress", "label unit done total fraction rate eta")
+
+
+class ProgressMeter:
+    # Turns (done, total) counts from process output or folder polling into a
+    # fraction, rate and ETA. Counts never go backwards, and a total that
+    # turns out too small grows with them. Safe to update from any thread.
+    def __init__(self, label, unit, total=None):
+        self.label = label
+        self.unit = unit
+        self.total = total or None
+        self.done = 0
+        self._first = None   # (time, done) of the first update, for the rate
+        self._lock = threading.Lock()
+
+    def update(self, done, total=None):
+        with self._lock:
+            now = time.monotonic()
+            if total:
+                self.total = total
+            if self._first is None:
+                self._first = (now, done)
+            self.done = max(self.done, done)
+            if self.total is not None:
+                self.total = max(self.total, self.done)
+            elapsed = now - self._first[0]
+            rate = (self.done - self._first[1]) / elapsed if elapsed >= 0.5 else None
+            fraction = self.done / self.total if self.total else None
+            eta = (self.total - self.done) / rate if rate and self.total else None
+            return Progress(self.label, self.unit, self.done, self.total, fraction, rate, eta)
+
+
+def describe_progress(progress):
+    # "12/40 cards (30%) · 3.1 cards/s · ETA 0:09"
+    if progress.total:
+        parts = [f"{progress.done}/{progress.total} {progress.unit} ({progress.fraction:.0%})"]
+    else:
+        parts = [f"{progress.done} {progress.unit}"]
+    if progress.rate:
+        parts.append(f"{progress.rate:.1f} {progress.unit}/s")
+    if progress.eta is not None:
+        eta = int(progress.eta)
+        parts.append(f"ETA {eta // 60}:{eta % 60:02d}")
+    return " · ".join(parts)
+
+
+def estimate_card_count(decklist_text):
+    # Rough number of cards (image files) a decklist produces: leading
+    # quantities ("4 Island", "2x Bolt") are summed, other lines count once.
+    # Blank lines, comments and section headers are skipped.
+    total = 0
+    for line in decklist_text.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#!/" or line.endswith(":"):
+            continue
+        match = re.match(r"(\d+)x?\s+\S", line)
+        total += int(match.group(1)) if match else 1
+    return total or None
+
+
+# -----------------------------
+# Helper: warm create_pdf worker
+# -----------------------------
+class PdfWorkerError(Exception):
+    pass
+
+
+class PdfWorker:
+    # Keeps create_pdf.py loaded in a long-lived process in the project venv
+    # (pdf_worker.py), so repeated PDFs skip interpreter start-up and the
+    # Pillow/font imports. A worker that has died is started again on the next
+    # job, and a job it died in is retried once in a fresh worker. Output is
+    # delivered as ProcessEvents, batched like StreamingProcess.
+    def __init__(self, python, project_path, flush_interval=0.1, tracer=None):
+        self.python = python
+        self.project_path = project_path
+        self.flush_interval = flush_interval
+        self.tracer = tracer
+        self.last_usage = None  # ResourceUsage of the last job (Linux only)
+        self.process = None
+        self._lines = None
+        self._lock = threading.Lock()
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def _start(self):
+        self.close()
+        self.process = subprocess.Popen([self.python, "-u", PDF_WORKER_SCRIPT, self.project_path],
+                                        cwd=self.project_path, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._lines = queue.Queue()
+
+        def reader(name, pipe, lines):
+            for line in read_lines(pipe):
+                lines.put((name, line))
+            pipe.close()
+            lines.put((name, None))
+
+        for name, pipe in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            threading.Thread(target=reader, args=(name, pipe, self._lines), daemon=True).start()
+
+    def _pump(self, on_events, until):
+        # Forwards output until a protocol message has the key `until`;
+        # returns that value, or None if the worker exited first
+        batch, last_flush = [], time.monotonic()
+        result = None
+        while True:
+            try:
+                name, raw = self._lines.get(timeout=self.flush_interval)
+            except queue.Empty:
+                name, raw = None, b""
+            if raw is None:
+                if name == "stdout":
+                    self.process.wait()  # so alive() sees the exit
+                    break
+            elif raw:
+                text = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                stream = "stderr"
+                if name == "stdout":
+                    try:
+                        message = json.loads(text)
+                    except ValueError:
+                        message = {"stream": "stdout", "line": text}
+                    if until in message:
+                        result = message[until]
+                        break
+                    stream, text = message.get("stream", "stdout"), message.get("line", "")
+                if text.strip():
+                    batch.extend(line_events(stream, text))
+            if batch and time.monotonic() - last_flush >= self.flush_interval:
+                on_events(batch)
+                batch, last_flush = [], time.monotonic()
+        if batch:
+            on_events(batch)
+        return result
+
+    def run(self, args, on_events=None):
+        on_events = on_events or (lambda events: None)
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if not self.alive():
+                        start = time.perf_counter()
+                        self._start()
+                        ready = self._pump(on_events, "ready")
+                        self._trace("start PDF worker", start, ready=bool(ready))
+                        if not ready:
+                            continue
+                    start = time.perf_counter()
+                    before = self._usage_snapshot()
+                    self.process.stdin.write((json.dumps({"args": list(args)}) + "\n").encode("utf-8"))
+                    self.process.stdin.flush()
+                except OSError:
+                    continue
+                code = self._pump(on_events, "exit")
+                self.last_usage = self._job_usage(before)
+                cpu = None if self.last_usage.user is None else self.last_usage.user + self.last_usage.system
+                self._trace("create_pdf.py (worker)", start, cpu, returncode=code, attempt=attempt + 1,
+                            **usage_args(self.last_usage))
+                if code is not None:
+                    on_events([ProcessEvent("exit", None, code)])
+                    return code
+            self.close()
+            raise PdfWorkerError("The PDF worker stopped unexpectedly twice")
+
+    def _trace(self, name, start, cpu=None, **args):
+        if self.tracer is not None:
+            self.tracer.add(name, "subprocess", start, time.perf_counter() - start, cpu,
+                            pid=self.process.pid if self.process else None, **args)
+
+    def _usage_snapshot(self):
+        # The worker outlives its jobs, so per-job figures are differences of
+        # its /proc counters; its peak RSS is reset through clear_refs
+        pid = self.process.pid
+        try:
+            with open(f"/proc/{pid}/clear_refs", "w", encoding="ascii") as f:
+                f.write("5")
+        except OSError:
+            pass
+        io = _proc_fields(f"/proc/{pid}/io", ("rchar", "wchar"))
+        return proc_cpu_times(pid), io
+
+    def _job_usage(self, before):
+        if self.process is None or self.process.poll() is not None:
+            return ResourceUsage(None, None, None, None, None)
+        pid = self.process.pid
+        (cpu_before, io_before), cpu = before, proc_cpu_times(pid)
+        io = _proc_fields(f"/proc/{pid}/io", ("rchar", "wchar"))
+        peak = _proc_fields(f"/proc/{pid}/status", ("VmHWM",)).get("VmHWM")
+        user = system = read = written = None
+        if cpu and cpu_before:
+            user, system = cpu[0] - cpu_before[0], cpu[1] - cpu_before[1]
+        if io and io_before:
+            read, written = io["rchar"] - io_before["rchar"], io["wchar"] - io_before["wchar"]
+        return ResourceUsage(peak * 1024 if peak else None, user, system, read, written)
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()  # the worker exits at end of input
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.process = None
+
+
+# -----------------------------
+# Helper: image import
+# -----------------------------
+# Linux ioctl that makes dst share src's blocks (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+
+def clone_file(src, dst):
+    # Copy-on-write clone; raises OSError where the filesystem cannot do it
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+        raise
+    shutil.copystat(src, dst)
+
+
+class ImageImporter:
+    # Brings files and folders (recursively) into one destination folder.
+    # Each file is reflinked, else hardlinked (when hardlinks is set), else
+    # copied; transfers run on a thread pool so slow network shares overlap.
+    # Name collisions are resolved against an in-memory set of taken names.
+    # on_progress(done, total) is called from the pool, at most every 0.1 s.
+    #
+    # With known_digests (sha256 -> imported path, shared between imports),
+    # files are hashed first: each distinct image is transferred once and its
+    # byte-identical copies are hardlinked to it.
+    def __init__(self, extensions, workers=8, hardlinks=True, known_digests=None,
+                 log=None, on_progress=None):
+        self.extensions = {ext.lower() for ext in extensions}
+        self.workers = workers
+        self.hardlinks = hardlinks
+        self.known_digests = known_digests
+        self.log_message = log or (lambda message: None)
+        self.on_progress = on_progress or (lambda done, total: None)
+        self._unsupported = set()   # (method, source device) pairs that failed
+        self._lock = threading.Lock()
+
+    def collect(self, sources):
+        files = []
+        for source in sources:
+            if os.path.isdir(source):
+                for root, dirs, names in os.walk(source):
+                    dirs.sort()
+                    files.extend(os.path.join(root, name) for name in sorted(names)
+                                 if os.path.splitext(name)[1].lower() in self.extensions)
+            else:
+                files.append(source)
+        return files
+
+    @staticmethod
+    def plan(files, destination_dir):
+        # (source, destination) pairs; "card.png" becomes "card_1.png", ... on
+        # collision. Names are compared case-insensitively (Windows, macOS).
+        taken = {name.lower() for name in os.listdir(destination_dir)}
+        next_suffix = {}
+        pairs = []
+        for src in files:
+            filename = os.path.basename(src)
+            if filename.lower() in taken:
+                name, ext = os.path.splitext(filename)
+                counter = next_suffix.get(filename.lower(), 1)
+                while f"{name}_{counter}{ext}".lower() in taken:
+                    counter += 1
+                next_suffix[filename.lower()] = counter + 1
+                filename = f"{name}_{counter}{ext}"
+            taken.add(filename.lower())
+            pairs.append((src, os.path.join(destination_dir, filename)))
+        return pairs
+
+    def _transfer(self, src, dst):
+        device = os.stat(src).st_dev
+        methods = [("cloned", clone_file)]
+        if self.hardlinks:
+            methods.append(("linked", os.link))
+        for method, func in methods:
+            if (method, device) in self._unsupported:
+                continue
+            try:
+                func(src, dst)
+                return method
+            except OSError:
+                with self._lock:
+                    self._unsupported.add((method, device))
+        shutil.copy2(src, dst)
+        return "copied"
+
+    def _link_duplicate(self, original, dst):
+        try:
+            os.link(original, dst)
+        except OSError:
+            shutil.copy2(original, dst)
+        return "deduplicated"
+
+    def import_files(self, sources, destination_dir):
+        os.makedirs(destination_dir, exist_ok=True)
+        pairs = self.plan(self.collect(sources), destination_dir)
+        counts = {"cloned": 0, "linked": 0, "copied": 0, "deduplicated": 0}
+        progress = {"done": 0, "reported": 0.0}
+
+        def record(run, src):
+            try:
+                counts[run()] += 1
+            except Exception as e:
+                self.log_message(f"Warning: Could not copy {src}: {e}")
+            progress["done"] += 1
+            now = time.monotonic()
+            if now - progress["reported"] >= 0.1 or progress["done"] == len(pairs):
+                progress["reported"] = now
+                self.on_progress(progress["done"], len(pairs))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            to_transfer, duplicates = pairs, []   # duplicates: (original, destination)
+            if self.known_digests is not None:
+                to_transfer, batch = [], set()
+                digests = pool.map(self._digest, [src for src, _ in pairs])
+                for (src, dst), digest in zip(pairs, digests):
+                    original = self.known_digests.get(digest) if digest else None
+                    if original and (original in batch or os.path.exists(original)):
+                        duplicates.append((original, dst))
+                        continue
+                    if digest:
+                        self.known_digests[digest] = dst
+                    batch.add(dst)
+                    to_transfer.append((src, dst))
+
+            futures = {pool.submit(self._transfer, src, dst): src for src, dst in to_transfer}
+            for future in as_completed(futures):
+                record(future.result, futures[future])
+        # Originals are all in place now
+        for original, dst in duplicates:
+            record(lambda: self._link_duplicate(original, dst), dst)
+        return counts
+
+    @staticmethod
+    def _digest(path):
+        try:
+            return CardImageStore.file_sha256(path)
+        except OSError:
+            return None
+
+
+# -----------------------------
+# Helper: venv fingerprint
+# -----------------------------
+# Written into the venv after a successful pip install. If requirements.txt,
+# the interpreter and the installed distributions all still match, pip is skipped.
+VENV_FINGERPRINT_FILE = ".gui_fingerprint.json"
+
+
+def shared_venv_path(requirements_path):
+    try:
+        with open(requirements_path, "rb") as f:
+            key = hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        key = "no-requirements"
+    return os.path.join(SHARED_VENV_DIR, f"py{sys.version_info[0]}{sys.version_info[1]}-{key}")
+
+
+def venv_python_path(venv_path):
+    if os.name == "nt":
+        return os.path.join(venv_path, "Scripts", "python.exe")
+    return os.path.join(venv_path, "bin", "python")
+
+
+def venv_site_packages(venv_path):
+    if os.name == "nt":
+        return [os.path.join(venv_path, "Lib", "site-packages")]
+    return sorted(glob.glob(os.path.join(venv_path, "lib", "python*", "site-packages")))
+
+
+def venv_fingerprint(venv_path, requirements_path):
+    with open(requirements_path, "rb") as f:
+        requirements = hashlib.sha256(f.read()).hexdigest()
+
+    python = None
+    try:
+        with open(os.path.join(venv_path, "pyvenv.cfg"), "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition("=")
+                if key.strip() in ("version", "version_info"):
+                    python = value.strip()
+    except OSError:
+        pass
+
+    dists = []
+    for site in venv_site_packages(venv_path):
+        try:
+            dists.extend(n for n in os.listdir(site) if n.endswith((".dist-info", ".egg-info")))
+        except OSError:
+            continue
+    distributions = hashlib.sha256("\n".join(sorted(dists)).encode("utf-8")).hexdigest()
+    return {"requirements": requirements, "python": python, "distributions": distributions}
+
+
+def venv_matches_fingerprint(venv_path, requirements_path):
+    try:
+        with open(os.path.join(venv_path, VENV_FINGERPRINT_FILE), "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        return stored == venv_fingerprint(venv_path, requirements_path)
+    except (OSError, ValueError):
+        return False
+
+
+def write_venv_fingerprint(venv_path, requirements_path):
+    with open(os.path.join(venv_path, VENV_FINGERPRINT_FILE), "w", encoding="utf-8") as f:
+        json.dump(venv_fingerprint(venv_path, requirements_path), f)
+
+
+# -----------------------------
+# Helper: image folder index
+# -----------------------------
+ImageEntry = namedtuple("ImageEntry", "path name size mtime_ns")
+
+
+class ImageIndex:
+    # One os.scandir pass per folder with extensions matched case-insensitively.
+    # Incremental scans reuse a folder's entries until its own mtime changes.
+    def __init__(self, extensions):
+        self.extensions = {ext.lower() for ext in extensions}
+        self._folders = {}    # directory -> (mtime_ns or None, [ImageEntry])
+        self._lock = threading.Lock()
+
+    def scan(self, directory, incremental=True):
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._folders.pop(directory, None)
+            return []
+        with self._lock:
+            cached = self._folders.get(directory)
+        if incremental and cached and cached[0] == dir_mtime:
+            return cached[1]
+
+        entries = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if os.path.splitext(entry.name)[1].lower() not in self.extensions:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append(ImageEntry(entry.path, entry.name, st.st_size, st.st_mtime_ns))
+        entries.sort(key=lambda e: e.name)
+
+        # A change within the filesystem's timestamp granularity would not move
+        # the mtime, so very fresh folders are rescanned next time regardless
+        trusted = time.time_ns() - dir_mtime > 2_000_000_000
+        with self._lock:
+            self._folders[directory] = (dir_mtime if trusted else None, entries)
+        return entries
+
+    def invalidate(self, directory=None):
+        with self._lock:
+            if directory is None:
+                self._folders.clear()
+            else:
+                self._folders.pop(directory, None)
+
+
+class ImageArrivals:
+    # Images that appeared in some folders since the last poll(), for work
+    # that should start while a plugin is still downloading. A file is only
+    # reported once its size and mtime held still between two polls, so
+    # half-written images are not decoded; poll(settle=False) reports the rest.
+    # The index only finds new files: their size and mtime are stat'ed here,
+    # as the index may hand back cached values for a file still being written.
+    def __init__(self, index, directories):
+        self.index = index
+        self.directories = list(directories)
+        self.reported = set()
+        self._pending = {}  # path -> (size, mtime_ns) at the previous poll
+
+    def poll(self, settle=True):
+        ready = []
+        for directory in self.directories:
+            for entry in self.index.scan(directory):
+                if entry.path in self.reported:
+                    continue
+                try:
+                    st = os.stat(entry.path)
+                except OSError:
+                    self._pending.pop(entry.path, None)
+                    continue
+                signature = (st.st_size, st.st_mtime_ns)
+                if not settle or (st.st_size and self._pending.get(entry.path) == signature):
+                    ready.append(entry.path)
+                    self.reported.add(entry.path)
+                    self._pending.pop(entry.path, None)
+                else:
+                    self._pending[entry.path] = signature
+        return ready
+
+
+# -----------------------------
+# Helper: content-addressed card image store
+# -----------------------------
+class CardImageStore:
+    # Blobs live under objects/<aa>/<sha256><ext>. index.json maps
+    # "<game>/<source>/<folder>/<identity>" to the blob plus the file name the
+    # plugin used, so a later run can put the card back where it came from.
+    def __init__(self, root_dir, max_bytes=IMAGE_STORE_MAX_BYTES):
+        self.root_dir = root_dir
+        self.objects_dir = os.path.join(root_dir, "objects")
+        self.index_path = os.path.join(root_dir, "index.json")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = None
+
+    @staticmethod
+    def normalize_text(text):
+        return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+    @classmethod
+    def card_identity(cls, filename, deck_identities=()):
+        # Some plugins prefix files with the deck position, which is not part
+        # of the card. A leading number is only dropped when the decklist the
+        # file was fetched for names the card without it, so "1996 World
+        # Champion" keeps its year.
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        identity = cls.normalize_text(stem)
+        if identity not in deck_identities:
+            unprefixed = cls.normalize_text(re.sub(r"^\d+[\s._-]*", "", stem))
+            if unprefixed in deck_identities:
+                return unprefixed
+        return identity
+
+    @classmethod
+    def decklist_identities(cls, decklist_text):
+        # Card identities in deck order, one per line: the quantity, set and
+        # collector number ("(M21) 123"), foil/category markers and comments
+        # are dropped, so "4x Fire // Ice (MH2) 290 *F*" -> "fire ice"
+        identities = []
+        for line in decklist_text.splitlines():
+            line = line.strip()
+            if not line or line[0] in "#!/" or line.endswith(":"):
+                continue
+            line = re.sub(r"^\d+x?\s+", "", line)
+            line = re.sub(r"\s+[\(\[].*$|\s+\*\w+\*.*$|\s+\^.*$|\s+#.*$", "", line)
+            identity = cls.normalize_text(line)
+            if identity:
+                identities.append(identity)
+        return identities
+
+    @staticmethod
+    def file_sha256(path):
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _object_path(self, entry):
+        digest = entry["hash"]
+        return os.path.join(self.objects_dir, digest[:2], digest + entry["ext"])
+
+    def _load(self):
+        if self._index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save(self):
+        os.makedirs(self.root_dir, exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self.index_path)
+
+    def _object_intact(self, entry):
+        try:
+            st = os.stat(self._object_path(entry))
+        except OSError:
+            return False
+        # A plugin that rewrites a hardlinked file in place changes the blob too
+        return st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]
+
+    def absorb(self, game, source, folder, paths, decklist_text=""):
+        # Moves working images into the store; returns how many were absorbed.
+        # decklist_text is the deck they were fetched for (see card_identity).
+        deck_identities = set(self.decklist_identities(decklist_text))
+        absorbed = 0
+        with self._lock:
+            index = self._load()
+            for path in paths:
+                name = os.path.basename(path)
+                identity = self.card_identity(name, deck_identities)
+                key = f"{game}/{source}/{folder}/{identity}"
+                old = index.get(key)
+                if old is not None:
+                    obj = self._object_path(old)
+                    try:
+                        linked = os.path.samefile(path, obj)
+                    except OSError:
+                        linked = False
+                    if linked:
+                        if self._object_intact(old):
+                            os.remove(path)
+                            old["last_used"] = time.time()
+                            absorbed += 1
+                            continue
+                        # Blob was overwritten through the link; it no longer matches its hash
+                        os.remove(obj)
+
+                digest = self.file_sha256(path)
+                entry = {"hash": digest, "ext": os.path.splitext(name)[1].lower(),
+                         "name": name, "folder": folder,
+                         "positioned": identity != self.normalize_text(os.path.splitext(name)[0])}
+                obj = self._object_path(entry)
+                if os.path.exists(obj):
+                    os.remove(path)
+                else:
+                    os.makedirs(os.path.dirname(obj), exist_ok=True)
+                    try:
+                        os.replace(path, obj)
+                    except OSError:
+                        shutil.move(path, obj)
+                st = os.stat(obj)
+                entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns, last_used=time.time())
+                index[key] = entry
+                absorbed += 1
+            self._evict()
+            self._save()
+        return absorbed
+
+    @staticmethod
+    def renumbered_name(name, position):
+        # The stored file name with its deck-position prefix (if it had one)
+        # changed to the card's position in this deck, keeping the padding
+        match = re.match(r"^(\d+)([\s._-]*)", name)
+        if not match:
+            return name
+        return f"{position:0{len(match.group(1))}d}{match.group(2)}{name[match.end():]}"
+
+    def prefill(self, game, source, decklist_text, folder_dirs):
+        # Copies stored cards named in the decklist into folder_dirs
+        # ({folder: dir}) under the name the plugin would write. Only for
+        # plugins in IMAGE_STORE_PREFILL_PLUGINS. The copies are reflinks
+        # where the filesystem can, never hardlinks: a plugin that rewrites a
+        # file in place must not change the blob.
+        if f"{game}/{source}" not in IMAGE_STORE_PREFILL_PLUGINS:
+            return 0
+        positions = {}
+        for position, identity in enumerate(self.decklist_identities(decklist_text), 1):
+            positions.setdefault(identity, position)
+        prefix = f"{game}/{source}/"
+        placed = 0
+        with self._lock:
+            index = self._load()
+            for key in list(index):
+                if not key.startswith(prefix):
+                    continue
+                entry = index[key]
+                position = positions.get(key.rsplit("/", 1)[-1])
+                dest_dir = folder_dirs.get(entry["folder"])
+                if position is None or dest_dir is None:
+                    continue
+                if not self._object_intact(entry):
+                    del index[key]
+                    continue
+                name = entry["name"]
+                if entry.get("positioned"):
+                    name = self.renumbered_name(name, position)
+                dest = os.path.join(dest_dir, name)
+                if os.path.exists(dest):
+                    continue
+                os.makedirs(dest_dir, exist_ok=True)
+                try:
+                    clone_file(self._object_path(entry), dest)
+                except OSError:
+                    shutil.copy2(self._object_path(entry), dest)
+                entry["last_used"] = time.time()
+                placed += 1
+            self._save()
+        return placed
+
+    def _evict(self):
+        # Sizes and recency are tracked per blob; several keys may share one
+        blobs = {}
+        for key, entry in self._index.items():
+            blob = blobs.setdefault(self._object_path(entry), {"size": entry["size"], "last_used": 0, "keys": []})
+            blob["last_used"] = max(blob["last_used"], entry["last_used"])
+            blob["keys"].append(key)
+        total = sum(b["size"] for b in blobs.values())
+        for obj, blob in sorted(blobs.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(obj)
+            except OSError:
+                pass
+            for key in blob["keys"]:
+                del self._index[key]
+            total -= blob["size"]
+
+
+# -----------------------------
+# Helper: background thumbnail decoding
+# -----------------------------
+def decode_thumbnail(image_path, box=THUMBNAIL_SIZE):
+    with Image.open(image_path) as img:
+        # JPEG can decode straight to 1/2, 1/4 or 1/8 scale; thumbnail() then
+        # uses reduce() for the remaining integer factor before resampling.
+        if img.format == "JPEG":
+            img.draft("RGB", box)
+        img.thumbnail(box, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        # Only images that are really transparent somewhere keep their alpha
+        # (and go to the cache as PNG); everything else is RGB, cached as JPEG
+        if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+            img = img.convert("RGBA")
+            if img.getchannel("A").getextrema()[0] == 255:
+                img = img.convert("RGB")
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        return img
+
+
+class ThumbnailDiskCache:
+    # Entries are keyed by a fingerprint of (path, size, mtime, box), so an
+    # edited or replaced image simply misses. Hits refresh the file mtime, which
+    # doubles as the LRU clock for eviction.
+    def __init__(self, cache_dir, max_bytes=THUMBNAIL_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None
+
+    def _key(self, image_path, box):
+        st = os.stat(image_path)
+        raw = f"{os.path.abspath(image_path)}|{st.st_size}|{st.st_mtime_ns}|{box[0]}x{box[1]}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, image_path, box):
+        key = self._key(image_path, box)
+        for ext in (".jpg", ".png"):
+            path = os.path.join(self.cache_dir, key[:2], key + ext)
+            try:
+                with Image.open(path) as img:
+                    img.load()
+            except OSError:
+                continue
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return img
+        return None
+
+    def put(self, image_path, box, img):
+        key = self._key(image_path, box)
+        # Alpha is kept (rounded card corners); everything else is stored as JPEG
+        ext = ".png" if img.mode == "RGBA" else ".jpg"
+        path = os.path.join(self.cache_dir, key[:2], key + ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        if ext == ".jpg":
+            img.save(tmp, "JPEG", quality=85)
+        else:
+            img.save(tmp, "PNG", compress_level=3)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += os.path.getsize(path)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for sub in os.scandir(self.cache_dir):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith((".jpg", ".png")):
+                    st = entry.stat()
+                    entries.append((entry.path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self):
+        # Trim to 90% so eviction does not run again on the very next write
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total = total
+
+
+class ThumbnailLoader:
+    # Decodes on a pool of worker threads and hands results back through a
+    # queue the Tk thread drains, so the Tk thread never decodes an image.
+    # Requests are served newest first: the rows the user is looking at win.
+    def __init__(self, box=THUMBNAIL_SIZE, workers=None, cache=None, tracer=None):
+        self.box = box
+        self.cache = cache               # optional ThumbnailDiskCache
+        self.tracer = tracer             # optional Tracer; one span per thumbnail
+        self.results = queue.Queue()     # (key, PIL image or None, error or None)
+        self._pending = queue.LifoQueue()
+        self._wanted = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._workers = workers or min(8, os.cpu_count() or 2)
+        for _ in range(self._workers):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def request(self, key, image_path):
+        with self._lock:
+            if key in self._wanted:
+                return
+            self._wanted.add(key)
+        self._pending.put((key, image_path))
+
+    def retain(self, keys):
+        # Drop queued requests that scrolled out of view before a worker got to them
+        with self._lock:
+            self._wanted.intersection_update(keys)
+
+    def close(self):
+        self._closed = True
+        for _ in range(self._workers):
+            self._pending.put(None)
+
+    def _load(self, image_path):
+        span = self.tracer.span("thumbnail", "thumbnails", items=1) if self.tracer \
+            else contextlib.nullcontext({"args": {}})
+        with span as record:
+            if self.cache is not None:
+                img = self.cache.get(image_path, self.box)
+                if img is not None:
+                    record["args"]["cached"] = True
+                    return img
+            img = decode_thumbnail(image_path, self.box)
+            if self.cache is not None:
+                try:
+                    self.cache.put(image_path, self.box, img)
+                except OSError:
+                    pass
+            return img
+
+    def _work(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            key, image_path = item
+            with self._lock:
+                if key not in self._wanted:
+                    continue
+            try:
+                result = (key, self._load(image_path), None)
+            except Exception as e:
+                result = (key, None, e)
+            with self._lock:
+                self._wanted.discard(key)
+            if not self._closed:
+                self.results.put(result)
+
+
+
+
+# -----------------------------
+# Helper: per-job project workspaces
+# -----------------------------
+# Folders each queued job gets its own copy of; everything else is linked
+JOB_ISOLATED_DIRS = ("front", "double_sided", "decklist", "output")
+JOB_WORKSPACES_DIRNAME = ".gui_jobs"
+
+# Held around steps 2-3 (venv creation and pip) by every engine in the process,
+# so a queued deck's setup never runs alongside the main workflow's
+ENVIRONMENT_LOCK = threading.Lock()
+
+
+def link_or_copy(src, dst):
+    try:
+        os.symlink(src, dst, target_is_directory=os.path.isdir(src))
+    except (OSError, NotImplementedError):
+        # Windows without symlink rights
+        if os.path.isdir(src):
+            shutil.copytree(src, dst)
+        else:
+            shutil.copy2(src, dst)
+
+
+def create_job_workspace(project_path, workspace):
+    # fetch.py and create_pdf.py work on game/* relative to their cwd, so a
+    # workspace that links the project but owns those folders isolates a job
+    os.makedirs(os.path.join(workspace, "game"))
+    for name in os.listdir(project_path):
+        if name in ("game", "venv", JOB_WORKSPACES_DIRNAME, ".gui_cache"):
+            continue
+        link_or_copy(os.path.join(project_path, name), os.path.join(workspace, name))
+    game_dir = os.path.join(project_path, "game")
+    for name in os.listdir(game_dir):
+        if name in JOB_ISOLATED_DIRS or name.startswith(".gui_"):
+            continue
+        link_or_copy(os.path.join(game_dir, name), os.path.join(workspace, "game", name))
+    for name in JOB_ISOLATED_DIRS:
+        os.makedirs(os.path.join(workspace, "game", name), exist_ok=True)
+
+
+# -----------------------------
+# Helper: worker process pools
+# -----------------------------
+def process_pool(max_workers):
+    # Workers are spawned, never forked: these pools are started from
+    # background threads of the Tk GUI, and a forked child of a multithreaded
+    # process can deadlock on a lock some other thread held at the fork
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+# -----------------------------
+# Helper: pre-flight normalization
+# -----------------------------
+# Card sizes in inches (create_pdf.py --card_size). Images are only shrunk to
+# PREFLIGHT_HEADROOM times this at the target PPI, leaving room for bleed.
+PREFLIGHT_CARD_INCHES = {
+    "standard": (2.5, 3.5), "standard_double": (3.5, 5.0), "japanese": (2.32, 3.39),
+    "poker": (2.5, 3.5), "poker_half": (1.75, 2.5), "bridge": (2.25, 3.5),
+    "bridge_square": (2.25, 2.25), "domino": (1.75, 3.5), "domino_square": (1.75, 1.75),
+    "tarot": (2.75, 4.75),
+}
+PREFLIGHT_HEADROOM = 1.15
+# Formats create_pdf.py reads cheaply; everything else is converted
+PREFLIGHT_KEEP_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+
+def preflight_box(ppi, card_size, crop=None):
+    # Largest useful (short, long) pixel size for a card, or None if unknown
+    inches = PREFLIGHT_CARD_INCHES.get(card_size)
+    if not inches:
+        return None
+    short, long_ = (side * ppi * PREFLIGHT_HEADROOM for side in inches)
+    match = re.fullmatch(r"([0-9.]+)(mm|in)?", crop or "")
+    if match:
+        # Cropped edges are cut away after scaling, so keep enough to crop from
+        value, unit = float(match.group(1)), match.group(2)
+        if unit is None and value < 50:
+            short, long_ = short / (1 - 2 * value / 100), long_ / (1 - 2 * value / 100)
+        elif unit:
+            extra = 2 * value * ppi / (25.4 if unit == "mm" else 1)
+            short, long_ = short + extra, long_ + extra
+    return int(short), int(long_)
+
+
+def preflight_image(path, box, cache_dir):
+    # Runs in a worker process. Returns (path, normalized file or None, status)
+    # where status is "ok" (nothing to do), "cached", "resized" or "converted".
+    ext = os.path.splitext(path)[1].lower()
+    with Image.open(path) as img:
+        size = img.size
+    resize = box is not None and (min(size) > box[0] or max(size) > box[1])
+    convert = ext not in PREFLIGHT_KEEP_EXTENSIONS
+    if not resize and not convert:
+        return path, None, "ok"
+
+    out_ext = ".jpg" if ext in (".jpg", ".jpeg") else ".png"
+    digest = CardImageStore.file_sha256(path)
+    key = f"{digest}-{box[0]}x{box[1]}" if resize else digest
+    cached = os.path.join(cache_dir, digest[:2], key + out_ext)
+    if os.path.exists(cached):
+        try:
+            os.utime(cached)  # LRU clock for trim_preflight_cache
+        except OSError:
+            pass
+        return path, cached, "cached"
+
+    with Image.open(path) as img:
+        if resize:
+            scale = min(box[0] / min(size), box[1] / max(size))
+            target = (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+            if img.format == "JPEG":
+                img.draft("RGB", target)  # decode at reduced size
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+            img = img.resize(target, Image.LANCZOS)
+        else:
+            img.load()
+            if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        if out_ext == ".jpg":
+            img.convert("RGB").save(tmp, "JPEG", quality=95)
+        else:
+            img.save(tmp, "PNG", compress_level=3)
+    os.replace(tmp, cached)
+    return path, cached, "resized" if resize else "converted"
+
+
+def trim_preflight_cache(cache_dir, max_bytes=PREFLIGHT_CACHE_MAX_BYTES):
+    # Oldest-first down to 90% of max_bytes (same policy as ThumbnailDiskCache)
+    entries = []
+    if os.path.isdir(cache_dir):
+        for sub in os.scandir(cache_dir):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    st = entry.stat()
+                    entries.append((entry.path, st.st_size, st.st_mtime))
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return
+    for path, size, _ in sorted(entries, key=lambda e: e[2]):
+        if total <= max_bytes * 0.9:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+# -----------------------------
+# Helper: duplicate detection
+# -----------------------------
+def dhash_file(path, size=8):
+    # 64-bit difference hash: one bit per horizontally adjacent pixel pair of
+    # a 9x8 greyscale thumbnail. Returns None for unreadable files.
+    try:
+        with Image.open(path) as img:
+            img.draft("L", (size * 8, size * 8))  # JPEG: decode at reduced size
+            small = img.convert("L").resize((size + 1, size), Image.BILINEAR)
+    except Exception:
+        return None
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            bits = (bits << 1) | (left > pixels[row * (size + 1) + col + 1])
+    return bits
+
+
+def group_near_duplicates(hashes, max_distance):
+    # hashes: {path: dHash}. Hashes within max_distance bits share at least
+    # one of 8 byte-wide bands (pigeonhole, up to 7 bits), so only paths in a
+    # common band bucket are compared. Returns lists of 2+ paths.
+    if max_distance <= 0:
+        return []
+    buckets = {}
+    for path, value in hashes.items():
+        for band in range(8):
+            buckets.setdefault((band, (value >> (band * 8)) & 0xFF), []).append(path)
+    parent = {path: path for path in hashes}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if find(a) != find(b) and bin(hashes[a] ^ hashes[b]).count("1") <= max_distance:
+                    parent[find(a)] = find(b)
+    groups = {}
+    for path in hashes:
+        groups.setdefault(find(path), []).append(path)
+    return [sorted(group) for group in groups.values() if len(group) > 1]
+
+
+# Run with the venv's Python: rewrites argv[1] with identical objects (images
+# of duplicate cards) stored once. Prints "before after" sizes in bytes.
+COMPACT_PDF_SCRIPT = """
+import os, sys
+try:
+    from pypdf import PdfWriter
+except ImportError:
+    sys.exit(3)
+if not hasattr(PdfWriter, "compress_identical_objects"):
+    sys.exit(3)
+path = sys.argv[1]
+writer = PdfWriter(clone_from=path)
+writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+writer.write(path + ".compact")
+before, after = os.path.getsize(path), os.path.getsize(path + ".compact")
+if after < before:
+    os.replace(path + ".compact", path)
+else:
+    os.remove(path + ".compact")
+    after = before
+print(before, after)
+"""
+
+
+# -----------------------------
+# Helper: PDF output tracking
+# -----------------------------
+# Every PDF the GUI builds is listed in <project>/.gui_cache/pdf_manifest.json
+PDF_MANIFEST_FILE = "pdf_manifest.json"
+PDF_MANIFEST_MAX_ENTRIES = 200
+
+
+def snapshot_pdfs(directories):
+    # {path: (size, mtime_ns)} for the PDFs directly inside each directory
+    found = {}
+    for directory in directories:
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.lower().endswith(".pdf") and entry.is_file():
+                        st = entry.stat()
+                        found[entry.path] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            continue
+    return found
+
+
+# -----------------------------
+# Helper: sharded PDF builds
+# -----------------------------
+# create_pdf.py defaults, used to look up how many cards fit on a sheet
+PDF_DEFAULT_PAPER_SIZE = "letter"
+PDF_DEFAULT_CARD_SIZE = "standard"
+# Options that point create_pdf.py at other folders cannot be split into shards
+PDF_SHARD_UNSUPPORTED_OPTIONS = ("--front_dir_path", "--back_dir_path", "--double_sided_dir_path",
+                                 "--output_path", "--output_images")
+
+# Run with the venv's Python: merges argv[2:] into argv[1] page by page
+# (images are copied as-is, not decoded). "--check" only tests the import.
+MERGE_PDFS_SCRIPT = """
+import sys
+try:
+    from pypdf import PdfWriter as Merger
+    if not hasattr(Merger, "append"):
+        from pypdf import PdfMerger as Merger
+except ImportError:
+    try:
+        from PyPDF2 import PdfMerger as Merger
+    except ImportError:
+        sys.exit(3)
+if sys.argv[1] == "--check":
+    sys.exit(0)
+merger = Merger()
+for path in sys.argv[2:]:
+    merger.append(path)
+with open(sys.argv[1], "wb") as f:
+    merger.write(f)
+"""
+
+
+def option_values(options, name):
+    # Values given for a command line option, as "--name value" or "--name=value"
+    values = []
+    for i, opt in enumerate(options):
+        if opt == name and i + 1 < len(options):
+            values.append(options[i + 1])
+        elif opt.startswith(name + "="):
+            values.append(opt.split("=", 1)[1])
+    return values
+
+
+def _find_nested(node, keys):
+    # First dict reached through keys[0], then keys[1], ... at any depth
+    if not keys:
+        return node
+    if isinstance(node, dict):
+        if keys[0] in node:
+            found = _find_nested(node[keys[0]], keys[1:])
+            if found is not None:
+                return found
+        for value in node.values():
+            found = _find_nested(value, keys)
+            if found is not None:
+                return found
+    return None
+
+
+def sheet_capacity(project_path, paper_size, card_size):
+    # Card slots per sheet from the project's layout file, or None if unknown
+    candidates = glob.glob(os.path.join(project_path, "assets", "*layout*.json")) + \
+        glob.glob(os.path.join(project_path, "*layout*.json"))
+    for path in candidates:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                layout = _find_nested(json.load(f), [paper_size, card_size])
+        except (OSError, ValueError):
+            continue
+        if not isinstance(layout, dict):
+            continue
+        if isinstance(layout.get("x_pos"), list) and isinstance(layout.get("y_pos"), list):
+            return len(layout["x_pos"]) * len(layout["y_pos"])
+        if isinstance(layout.get("positions"), list):
+            return len(layout["positions"])
+    return None
+
+
+# -----------------------------
+# Workflow engine (no UI)
+# -----------------------------
+class WorkflowEngine:
+    # The seven-step workflow without any UI. Front ends observe it through
+    # the callbacks, which may be called from any thread, and provide step 5
+    # input through use_decklist() / import_images().
+    STEP_PROGRESS = [0.14, 0.28, 0.42, 0.56, 0.70, 0.85, 1.0]
+    STEP_NAMES = ["1. Navigate to project directory", "2. Create virtual environment",
+                  "3. Activate venv & install requirements", "4. Clean image directories",
+                  "5. Choose input method", "6. Download/process images", "7. Create PDF"]
+    _history_lock = threading.Lock()  # shared: queued jobs finish their runs in parallel
+
+    def __init__(self, log=None, on_step=None, on_status=None, on_progress=None,
+                 on_task_progress=None, on_new_images=None, image_store=None):
+        self.log_message = log or (lambda message: None)
+        self.on_step = on_step or (lambda index, status: None)
+        self.on_status = on_status or (lambda text: None)
+        self.on_progress = on_progress or (lambda value: None)
+        # Progress of the download / PDF build in the running step
+        self.on_task_progress = on_task_progress or (lambda progress: None)
+        # Finished images found in game/front and game/double_sided while a
+        # plugin is still downloading (lists of paths, from the watcher thread)
+        self.on_new_images = on_new_images or (lambda paths: None)
+        self._task = None               # (step index, ProgressMeter)
+        self._task_events_seen = False  # the process reports its own N/M progress
+
+        self.supported_image_extensions = set(SUPPORTED_IMAGE_EXTENSIONS)
+        self.image_index = ImageIndex(self.supported_image_extensions)
+        # Images from earlier plugin runs, reused instead of re-downloading.
+        # Engines running side by side must share one store (it caches its index).
+        self.image_store = image_store or CardImageStore(IMAGE_STORE_DIR)
+
+        # Paths (discovered later)
+        self.project_path = None
+        self.venv_path = None
+        self.venv_python = None
+        self.use_pdf_worker = USE_PDF_WORKER and os.path.exists(PDF_WORKER_SCRIPT)
+        self.pdf_worker = None
+        self.pdf_shards = 1  # > 1 splits step 7 across that many processes
+        self._pdf_merge_checked = {}  # venv python -> whether it can merge PDF shards
+        self.preflight = False  # normalize uploaded images before step 7
+        # sha256 -> path of every image imported since the last cleanup
+        self.imported_digests = {}
+        self._dhashes = {}      # (path, size, mtime_ns) -> dHash
+        self._pdf_output = None  # create_pdf.py output, collected to find the PDF it wrote
+        self._manifest_lock = threading.Lock()
+        # Spans of the current run; written to TRACE_DIR by finish_run()
+        self.tracer = Tracer()
+        self.trace_path = None
+        self._step_starts = {}  # step index -> (perf_counter, thread_time, thread id)
+        # Subprocesses since the last finish_run(), for the run history
+        self.process_records = []
+        self.decklist_path = None
+        self.front_dir = None
+        self.double_sided_dir = None
+        self.output_dir = None
+        self.fetch_marker_path = None
+
+        # Step 5 choice
+        self.input_method = None
+        self.selected_dir = None
+        self.selected_source = None
+
+    def start_step(self, index, status_text):
+        self._step_starts[index] = (time.perf_counter(), time.thread_time(), threading.get_ident())
+        self.on_step(index, "running")
+        self.on_status(status_text)
+
+    def finish_step(self, index):
+        self._end_step_span(index, "completed")
+        self.on_step(index, "completed")
+        self.on_progress(self.STEP_PROGRESS[index])
+
+    def _end_step_span(self, index, outcome):
+        started = self._step_starts.pop(index, None)
+        if started is None:
+            return
+        start, cpu, thread = started
+        # CPU time is only meaningful when the step finished on the thread it started on
+        cpu = time.thread_time() - cpu if thread == threading.get_ident() else None
+        self.tracer.add(self.STEP_NAMES[index], "step", start, time.perf_counter() - start, cpu,
+                        outcome=outcome)
+
+    # -------------- Tracing --------------
+    def reset_trace(self):
+        self.tracer.reset()
+        self._step_starts.clear()
+        self.trace_path = None
+
+    def run_process(self, cmd, name, on_events=None, cwd=None, env=None):
+        # Runs a workflow subprocess: traced, and its resource use logged and
+        # kept for the run history
+        process = StreamingProcess(cmd, cwd=cwd or self.project_path, env=env, on_events=on_events,
+                                   tracer=self.tracer, name=name)
+        code = process.run()
+        self.record_usage(name, process.wall, process.usage, code)
+        return code
+
+    def record_usage(self, name, wall, usage, returncode):
+        self.log_message(f"Resources of {name} ({wall:.1f}s): {describe_usage(usage)}")
+        record = {"name": name, "wall_s": round(wall, 3), "returncode": returncode}
+        record.update(usage_args(usage))
+        self.process_records.append(record)
+
+    def finish_run(self):
+        # Logs the per-span summary, (re)writes this run's Chrome trace and
+        # appends it to the run history. Steps still open here did not finish.
+        for index in list(self._step_starts):
+            self._end_step_span(index, "unfinished")
+        if not self.tracer.spans:
+            return None
+        self.append_run_history()
+        if self.trace_path is None:
+            # Named once per run, so a second PDF from the same run rewrites it
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.tracer.started_at))
+            self.trace_path = os.path.join(TRACE_DIR, f"run-{stamp}-{os.getpid()}-{id(self):x}.json")
+        self.log_message("Run timing:")
+        for line in self.tracer.summary_lines():
+            self.log_message(f"  {line}")
+        try:
+            self.tracer.export_chrome(self.trace_path)
+            traces = sorted(glob.glob(os.path.join(TRACE_DIR, "run-*.json")), key=os.path.getmtime)
+            for old in traces[:-TRACE_KEEP]:
+                os.remove(old)
+        except OSError as e:
+            self.log_message(f"Warning: Could not write the trace: {e}")
+            return None
+        self.log_message(f"Trace (open in ui.perfetto.dev or chrome://tracing): {self.trace_path}")
+        return self.trace_path
+
+    def append_run_history(self):
+        # One line per finish_run(); when the file grows past
+        # RUN_HISTORY_MAX_BYTES the older half is dropped
+        with self.tracer._lock:
+            steps = {s["name"]: round(s["wall"], 3) for s in self.tracer.spans if s["cat"] == "step"}
+        entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+                 "project": self.project_path, "input_method": self.input_method,
+                 "platform": sys.platform, "cpus": os.cpu_count(),
+                 "steps": steps, "processes": self.process_records}
+        self.process_records = []
+        try:
+            os.makedirs(os.path.dirname(RUN_HISTORY_FILE), exist_ok=True)
+            with self._history_lock:
+                with open(RUN_HISTORY_FILE, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+                if os.path.getsize(RUN_HISTORY_FILE) > RUN_HISTORY_MAX_BYTES:
+                    with open(RUN_HISTORY_FILE, "r", encoding="utf-8") as f:
+                        lines = f.readlines()
+                    tmp = f"{RUN_HISTORY_FILE}.{threading.get_ident()}.tmp"
+                    with open(tmp, "w", encoding="utf-8") as f:
+                        f.writelines(lines[len(lines) // 2:])
+                    os.replace(tmp, RUN_HISTORY_FILE)
+        except OSError as e:
+            self.log_message(f"Warning: Could not update the run history: {e}")
+
+    def begin_task(self, index, label, unit, total=None):
+        self._task = (index, ProgressMeter(label, unit, total))
+        self._task_events_seen = False
+
+    def report_task(self, done, total=None):
+        # Moves the overall bar through the running step's share of it
+        task = self._task
+        if task is None:
+            return
+        index, meter = task
+        progress = meter.update(done, total)
+        self.on_task_progress(progress)
+        if progress.fraction is not None:
+            low = self.STEP_PROGRESS[index - 1] if index else 0.0
+            self.on_progress(low + progress.fraction * (self.STEP_PROGRESS[index] - low))
+
+    def end_task(self):
+        self._task = None
+
+    def log_process_events(self, events):
+        for event in events:
+            if event.kind == "progress":
+                self._task_events_seen = True
+                self.report_task(*event.data)
+                continue
+            if event.kind != "line":
+                continue
+            if self._pdf_output is not None:
+                self._pdf_output.append(event.data)
+            if event.stream == "stderr":
+                self.log_message(f"Errors: {event.data}")
+            else:
+                self.log_message(event.data)
+
+    def get_all_image_files_in_directory(self, directory):
+        return [entry.path for entry in self.image_index.scan(directory)]
+
+    # -------------- Project discovery --------------
+    def validate_project_directory(self, path):
+        if not os.path.exists(path):
+            return False
+        expected_items = ["game", "plugins", "create_pdf.py"]
+        for item in expected_items:
+            if not os.path.exists(os.path.join(path, item)):
+                return False
+        return True
+
+    def cached_project_directory(self):
+        cached = self.load_project_locations().get(PROJECT_VERSION)
+        if cached and self.validate_project_directory(cached):
+            return cached
+        return None
+
+    def load_project_locations(self):
+        try:
+            with open(PROJECT_LOCATIONS_FILE, "r", encoding="utf-8") as f:
+                return json.load(f).get("versions", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def save_project_locations(self, versions):
+        try:
+            known = self.load_project_locations()
+            known.update(versions)
+            os.makedirs(os.path.dirname(PROJECT_LOCATIONS_FILE), exist_ok=True)
+            tmp = PROJECT_LOCATIONS_FILE + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"versions": known}, f, indent=2)
+            os.replace(tmp, PROJECT_LOCATIONS_FILE)
+        except OSError as e:
+            self.log_message(f"Warning: Could not save project locations: {e}")
+
+    def find_project_directory(self):
+        project_folder_name = PROJECT_FOLDER_NAME
+        search_locations = [
+            os.getcwd(),
+            os.path.expanduser("~"),
+            os.path.join(os.path.expanduser("~"), "Downloads"),
+            os.path.join(os.path.expanduser("~"), "Documents"),
+            os.path.join(os.path.expanduser("~"), "Desktop"),
+            os.path.join(os.path.expanduser("~"), "Projects"),
+            os.path.join(os.path.expanduser("~"), "Workspace"),
+            os.path.dirname(os.getcwd()),
+            os.path.dirname(os.path.dirname(os.getcwd())),
+        ]
+
+        extended = []
+        for loc in search_locations:
+            extended.append(loc)
+            try:
+                if os.path.exists(loc):
+                    for item in os.listdir(loc):
+                        p = os.path.join(loc, item)
+                        if os.path.isdir(p):
+                            extended.append(p)
+            except Exception:
+                continue
+
+        # Index every project version seen on the way so later starts need no scan
+        versions = {}
+        for loc in extended:
+            base = os.path.basename(loc)
+            if not base.startswith("silhouette-card-maker-"):
+                continue
+            for path in (os.path.join(loc, base), loc):
+                if self.validate_project_directory(path):
+                    versions.setdefault(base.split("-")[-1], path)
+                    break
+
+        found = None
+        for loc in extended:
+            if not loc or not os.path.exists(loc):
+                continue
+
+            candidate = os.path.join(loc, project_folder_name)
+            if os.path.exists(candidate) and self.validate_project_directory(candidate):
+                self.log_message(f"Found project directory: {candidate}")
+                found = candidate
+                break
+
+            if os.path.basename(loc) == project_folder_name and self.validate_project_directory(loc):
+                self.log_message(f"Found project directory: {loc}")
+                found = loc
+                break
+
+            nested = os.path.join(candidate, project_folder_name)
+            if os.path.exists(nested) and self.validate_project_directory(nested):
+                self.log_message(f"Found project directory (nested): {nested}")
+                found = nested
+                break
+
+        if found:
+            versions[PROJECT_VERSION] = found
+        if versions:
+            self.save_project_locations(versions)
+        if not found:
+            self.log_message(f"Could not find '{project_folder_name}' in common locations.")
+        return found
+
+    def set_project_directory(self, path):
+        # Absolute, so the paths below stay valid whatever the working directory
+        self.project_path = os.path.abspath(path)
+        self.close_pdf_worker()
+        if USE_SHARED_VENVS:
+            self.venv_path = shared_venv_path(os.path.join(self.project_path, "requirements.txt"))
+        else:
+            self.venv_path = os.path.join(self.project_path, "venv")
+        self.decklist_path = os.path.join(self.project_path, "game", "decklist", "my_decklist.txt")
+        self.front_dir = os.path.join(self.project_path, "game", "front")
+        self.double_sided_dir = os.path.join(self.project_path, "game", "double_sided")
+        self.output_dir = os.path.join(self.project_path, "game", "output")
+        # Records which game/source produced the images currently in game/front
+        self.fetch_marker_path = os.path.join(self.project_path, "game", ".gui_last_fetch.json")
+        self.log_message(f"✓ Project directory: {self.project_path}")
+
+    # -------------- Steps 1-4 --------------
+    # Step 1
+    def execute_step_1(self):
+        self.reset_trace()
+        self.start_step(0, "Navigating to project directory...")
+
+        if not self.project_path or not os.path.exists(self.project_path):
+            raise Exception("Project directory not found or not accessible")
+
+        # No chdir: every subprocess is started with cwd=project_path, and the
+        # caller's relative paths (--decklist, --images) keep working
+        self.log_message(f"✓ Using project directory: {self.project_path}")
+        self.finish_step(0)
+
+    # Step 2
+    def execute_step_2(self):
+        self.start_step(1, "Creating virtual environment...")
+
+        if os.path.exists(self.venv_path) and not os.path.exists(venv_python_path(self.venv_path)):
+            # Left behind by an interrupted creation
+            self.log_message("Removing incomplete virtual environment...")
+            shutil.rmtree(self.venv_path, ignore_errors=True)
+
+        if not os.path.exists(self.venv_path):
+            self.log_message(f"Creating virtual environment: {self.venv_path}")
+            os.makedirs(os.path.dirname(self.venv_path), exist_ok=True)
+            uv = shutil.which("uv")
+            if uv:
+                # --seed keeps pip in the venv for building the wheelhouse
+                cmd = [uv, "venv", "--seed", "--python", sys.executable, self.venv_path]
+            else:
+                cmd = [sys.executable, "-m", "venv", self.venv_path]
+            errors = deque(maxlen=20)
+
+            def log_venv(events):
+                for event in events:
+                    if event.kind == "line":
+                        self.log_message(f"venv: {event.data}")
+                        if event.stream == "stderr":
+                            errors.append(event.data)
+
+            if self.run_process(cmd, "uv venv" if uv else "python -m venv", on_events=log_venv) != 0:
+                raise Exception(f"Failed to create virtual environment: {' '.join(errors)}")
+            self.log_message("✓ Virtual environment created successfully")
+        else:
+            self.log_message("✓ Virtual environment already exists")
+
+        self.finish_step(1)
+
+    # Step 3
+    def execute_step_3(self):
+        self.start_step(2, "Configuring virtual environment...")
+
+        venv_python = venv_python_path(self.venv_path)
+        if not os.path.exists(venv_python):
+            raise Exception("Virtual environment Python executable not found")
+
+        self.venv_python = venv_python
+        self.log_message("✓ Virtual environment configured for use")
+
+        self.on_status("Installing requirements...")
+        requirements_path = os.path.join(self.project_path, "requirements.txt")
+        if not os.path.exists(requirements_path):
+            self.log_message("Warning: requirements.txt not found, skipping package installation")
+        elif venv_matches_fingerprint(self.venv_path, requirements_path):
+            self.log_message("✓ Requirements unchanged since last install, skipping pip")
+        else:
+            if USE_WHEELHOUSE:
+                self.install_from_wheelhouse(requirements_path)
+            else:
+                return_code = self.run_pip(self.pip_install_cmd(requirements_path))
+                if return_code != 0:
+                    raise Exception(f"pip install failed with exit code: {return_code}")
+            write_venv_fingerprint(self.venv_path, requirements_path)
+            self.close_pdf_worker()  # it may have the old packages loaded
+            self._pdf_merge_checked.pop(self.venv_python, None)
+            self.log_message("✓ Requirements installed successfully")
+
+        self.finish_step(2)
+
+    def pip_install_cmd(self, requirements_path, offline=False):
+        uv = shutil.which("uv")
+        if uv:
+            cmd = [uv, "pip", "install", "--python", self.venv_python]
+        else:
+            cmd = [self.venv_python, "-m", "pip", "install"]
+        if offline:
+            cmd += ["--no-index", "--find-links", WHEELHOUSE_DIR]
+        return cmd + ["-r", requirements_path]
+
+    def run_pip(self, cmd):
+        self.log_message(f"Running: {' '.join(cmd)}")
+        env = dict(os.environ, PIP_CACHE_DIR=PIP_CACHE_DIR)
+
+        def log_pip(events):
+            for event in events:
+                if event.kind != "line":
+                    continue
+                if event.stream == "stderr":
+                    if not event.data.startswith("WARNING"):
+                        self.log_message(f"pip error: {event.data}")
+                else:
+                    self.log_message(f"pip: {event.data}")
+
+        name = "uv pip" if os.path.basename(cmd[0]).startswith("uv") else f"pip {cmd[3]}"
+        return self.run_process(cmd, name, on_events=log_pip, env=env)
+
+    def install_from_wheelhouse(self, requirements_path):
+        # Try the wheelhouse alone first; only go to the network for missing wheels
+        if os.path.isdir(WHEELHOUSE_DIR) and os.listdir(WHEELHOUSE_DIR):
+            if self.run_pip(self.pip_install_cmd(requirements_path, offline=True)) == 0:
+                self.log_message("✓ Requirements installed from local wheelhouse")
+                return
+            self.log_message("Wheelhouse is missing some requirements, updating it...")
+
+        os.makedirs(WHEELHOUSE_DIR, exist_ok=True)
+        return_code = self.run_pip([self.venv_python, "-m", "pip", "wheel",
+                                    "-r", requirements_path, "-w", WHEELHOUSE_DIR])
+        if return_code == 0:
+            return_code = self.run_pip(self.pip_install_cmd(requirements_path, offline=True))
+        else:
+            self.log_message("Warning: Could not build wheelhouse, installing from package index")
+            return_code = self.run_pip(self.pip_install_cmd(requirements_path))
+        if return_code != 0:
+            raise Exception(f"pip install failed with exit code: {return_code}")
+
+    # Step 4
+    def execute_step_4(self, store_images=True):
+        self.start_step(3, "Cleaning image files...")
+
+        # Images from a download by a plugin in IMAGE_STORE_PREFILL_PLUGINS
+        # are moved into the image store, not deleted, unless the caller wants
+        # them gone for good (a redownload)
+        last_fetch = None
+        try:
+            with open(self.fetch_marker_path, "r", encoding="utf-8") as f:
+                last_fetch = json.load(f)
+        except (OSError, ValueError):
+            pass
+        absorb_into = None
+        decklist_content = ""
+        if store_images and last_fetch and \
+                f"{last_fetch['game']}/{last_fetch['source']}" in IMAGE_STORE_PREFILL_PLUGINS:
+            absorb_into = last_fetch
+            try:
+                with open(self.decklist_path, "r", encoding="utf-8") as f:
+                    decklist_content = f.read()
+            except OSError:
+                pass
+
+        self.imported_digests.clear()
+        directories = [("front", self.front_dir), ("double_sided", self.double_sided_dir)]
+        total_deleted = 0
+        total_stored = 0
+        for folder, directory in directories:
+            if os.path.exists(directory):
+                image_files = self.get_all_image_files_in_directory(directory)
+                if absorb_into:
+                    try:
+                        with self.tracer.span("absorb into image store", "files", folder=folder) as span:
+                            stored = self.image_store.absorb(absorb_into["game"], absorb_into["source"],
+                                                             folder, image_files, decklist_content)
+                            span["items"] = stored
+                        total_stored += stored
+                        self.log_message(f"✓ Moved {stored} image files from {directory} into the image store")
+                        image_files = self.get_all_image_files_in_directory(directory)
+                    except Exception as e:
+                        self.log_message(f"Warning: Could not store images from {directory}: {e}")
+                with self.tracer.span("delete images", "files", items=len(image_files), folder=folder):
+                    for image_file in image_files:
+                        try:
+                            os.remove(image_file)
+                            total_deleted += 1
+                        except Exception as e:
+                            self.log_message(f"Warning: Could not delete {image_file}: {e}")
+                self.log_message(f"✓ Cleaned {len(image_files)} image files from {directory}")
+            else:
+                self.log_message(f"Warning: Directory not found: {directory}")
+        if last_fetch:
+            try:
+                os.remove(self.fetch_marker_path)
+            except OSError:
+                pass
+        if absorb_into:
+            self.log_message(f"✓ Total image files stored: {total_stored}")
+        self.log_message(f"✓ Total image files deleted: {total_deleted}")
+
+        self.finish_step(3)
+
+    # -------------- Step 5: input --------------
+    def start_input_step(self):
+        # Started by prepare(); here for callers that go straight to an input
+        if 4 not in self._step_starts:
+            self.start_step(4, "Choose input method...")
+
+    def use_decklist(self, decklist_content, game_dir, source):
+        self.start_input_step()
+        if not decklist_content:
+            raise Exception("No decklist provided")
+        os.makedirs(os.path.dirname(self.decklist_path), exist_ok=True)
+        with open(self.decklist_path, "w", encoding="utf-8") as f:
+            f.write(decklist_content)
+        self.log_message(f"✓ Decklist file created: {self.decklist_path}")
+        self.input_method = "plugin"
+        self.selected_dir = game_dir
+        self.selected_source = source
+        self.finish_step(4)
+
+    def import_images(self, front_files=(), double_sided_files=()):
+        os.makedirs(self.front_dir, exist_ok=True)
+        os.makedirs(self.double_sided_dir, exist_ok=True)
+        count = self.copy_files_to_directory(front_files, self.front_dir)
+        count += self.copy_files_to_directory(double_sided_files, self.double_sided_dir)
+        return count
+
+    def use_uploaded_images(self, uploaded_count):
+        self.start_input_step()
+        if uploaded_count == 0:
+            raise Exception("No images were uploaded")
+        self.log_message(f"✓ {uploaded_count} images uploaded successfully")
+        self.input_method = "upload"
+        self.finish_step(4)
+
+    def copy_files_to_directory(self, source_files, destination_dir, on_progress=None):
+        # source_files may include folders, which are imported recursively
+        importer = ImageImporter(self.supported_image_extensions, hardlinks=IMPORT_HARDLINKS,
+                                 known_digests=self.imported_digests if DEDUPE_IMPORTS else None,
+                                 log=self.log_message, on_progress=on_progress)
+        with self.tracer.span("import images", "files", folder=os.path.basename(destination_dir)) as span:
+            counts = importer.import_files(source_files, destination_dir)
+            span["items"] = sum(counts.values())
+            span["args"].update(counts)
+        self.image_index.invalidate(destination_dir)
+        shared = counts["cloned"] + counts["linked"]
+        if shared:
+            self.log_message(f"Imported {shared} images without copying data "
+                             f"({counts['cloned']} reflinked, {counts['linked']} hardlinked)")
+        if counts["deduplicated"]:
+            self.log_message(f"✓ {counts['deduplicated']} images were exact copies of others "
+                             "and are stored once")
+        return sum(counts.values())
+
+    def find_near_duplicates(self, paths, max_distance=NEAR_DUPLICATE_DISTANCE):
+        # Groups of images that look the same but are not byte-identical
+        # (another scan, crop or format of the same art). dHashes are computed
+        # in a process pool and remembered per file version.
+        if Image is None or not paths:
+            return []
+        keys = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            keys[path] = (path, st.st_size, st.st_mtime_ns)
+        missing = [path for path, key in keys.items() if key not in self._dhashes]
+        if missing:
+            with self.tracer.span("dHash images", "files", items=len(missing)), \
+                    process_pool(min(os.cpu_count() or 1, len(missing))) as pool:
+                for path, value in zip(missing, pool.map(dhash_file, missing, chunksize=16)):
+                    if value is not None:
+                        self._dhashes[keys[path]] = value
+        hashes = {path: self._dhashes[key] for path, key in keys.items() if key in self._dhashes}
+
+        groups = []
+        for group in group_near_duplicates(hashes, max_distance):
+            # Deliberate copies of one card (4x Island) are not worth reporting
+            digests = {ImageImporter._digest(path) for path in group}
+            if len(digests) > 1:
+                groups.append(group)
+        return groups
+
+    # -------------- Step 6: download/process images --------------
+    def execute_step_6(self, reuse_stored=True):
+        if self.input_method == "upload":
+            self.start_step(5, "Processing uploaded images...")
+            front_images = self.get_all_image_files_in_directory(self.front_dir)
+            double_images = self.get_all_image_files_in_directory(self.double_sided_dir)
+            total = len(front_images) + len(double_images)
+            if total == 0:
+                raise Exception("No uploaded images found")
+            self.log_message(f"✓ Found {len(front_images)} front and {len(double_images)} double-faced images")
+        elif self.input_method == "plugin":
+            self.start_step(5, "Downloading card images...")
+            self.download_images(self.selected_dir, self.selected_source, reuse_stored)
+        else:
+            raise Exception("No input method selected")
+        self.finish_step(5)
+
+    def download_images(self, plug_dir, plug_src, reuse_stored=True):
+        if not plug_dir or not plug_src:
+            raise Exception("Plugin selection missing")
+
+        decklist_content = ""
+        try:
+            with open(self.decklist_path, "r", encoding="utf-8") as f:
+                decklist_content = f.read()
+        except OSError:
+            pass
+        # Reuse cards from earlier downloads before the plugin starts fetching
+        if reuse_stored:
+            try:
+                with self.tracer.span("prefill from image store", "files") as span:
+                    reused = self.image_store.prefill(
+                        plug_dir, plug_src, decklist_content,
+                        {"front": self.front_dir, "double_sided": self.double_sided_dir})
+                    span["items"] = reused
+                if reused:
+                    self.log_message(f"✓ Reused {reused} card images from the image store")
+            except Exception as e:
+                self.log_message(f"Warning: Could not read from the image store: {e}")
+        with open(self.fetch_marker_path, "w", encoding="utf-8") as f:
+            json.dump({"game": plug_dir, "source": plug_src}, f)
+
+        cmd = [self.venv_python, f"plugins/{plug_dir}/fetch.py", "game/decklist/my_decklist.txt", plug_src]
+
+        self.log_message("Starting card image download...")
+        self.log_message(f"Command: {' '.join(cmd)}")
+
+        # Every image that lands in game/front is a finished card, unless
+        # fetch.py prints its own N/M progress. New images are also handed to
+        # on_new_images as they settle, so the preview can fill in meanwhile.
+        self.begin_task(5, "Downloading card images", "cards", estimate_card_count(decklist_content))
+        stop = threading.Event()
+        arrivals = ImageArrivals(self.image_index, [self.front_dir, self.double_sided_dir])
+
+        def count_front():
+            if not self._task_events_seen:
+                self.report_task(len(self.image_index.scan(self.front_dir)))
+
+        def report_arrivals(settle=True):
+            new = arrivals.poll(settle)
+            if new:
+                self.on_new_images(new)
+
+        def watch_front():
+            while not stop.wait(0.5):
+                count_front()
+                report_arrivals()
+
+        watcher = threading.Thread(target=watch_front, daemon=True)
+        watcher.start()
+        try:
+            return_code = self.run_process(cmd, f"fetch.py {plug_dir}/{plug_src}",
+                                           on_events=self.log_process_events)
+        finally:
+            stop.set()
+            watcher.join()
+            # fetch.py may have renamed or removed files it wrote earlier
+            self.image_index.invalidate(self.front_dir)
+            self.image_index.invalidate(self.double_sided_dir)
+            count_front()
+            report_arrivals(settle=False)
+            self.end_task()
+        if return_code != 0:
+            raise Exception(f"Download failed with exit code: {return_code}")
+
+        self.log_message("✓ Card images downloaded successfully")
+
+    # -------------- Step 7: PDF --------------
+    def create_pdf(self, options):
+        # Returns the path of the new PDF, or None if it could not be located
+        self.start_step(6, "Creating PDF...")
+        if self.preflight:
+            if self.input_method == "upload":
+                self.preflight_images(options)
+            else:
+                self.log_message("Pre-flight skipped: plugin images are already sized for printing")
+            self.on_status("Creating PDF...")
+        self.log_message("Creating PDF...")
+        if self.pdf_shards > 1:
+            try:
+                pdf_file = self.create_pdf_sharded(options, self.pdf_shards)
+            finally:
+                self.end_task()
+            if pdf_file:
+                self.log_message("✅ PDF created successfully!")
+                self.compact_pdf(pdf_file)
+                self.record_pdf(pdf_file, options)
+                self.finish_step(6)
+                return pdf_file
+
+        search_dirs = self.pdf_search_dirs(options)
+        before = snapshot_pdfs(search_dirs)
+        output = self._pdf_output = deque(maxlen=200)
+        self.begin_task(6, "Creating PDF", "items")
+        try:
+            return_code = self.run_create_pdf(options)
+        finally:
+            self._pdf_output = None
+            self.end_task()
+        if return_code != 0:
+            raise Exception(f"PDF creation failed with exit code: {return_code}")
+
+        self.log_message("✅ PDF created successfully!")
+        with self.tracer.span("locate PDF", "files"):
+            pdf_file = self.locate_created_pdf(options, search_dirs, before, list(output))
+        if pdf_file:
+            self.log_message(f"Output PDF: {pdf_file}")
+            self.compact_pdf(pdf_file)
+            self.record_pdf(pdf_file, options)
+        self.finish_step(6)
+        return pdf_file
+
+    def count_duplicate_images(self, paths):
+        # Byte-identical images; only files of equal size are hashed
+        by_size = {}
+        for path in paths:
+            try:
+                by_size.setdefault(os.path.getsize(path), []).append(path)
+            except OSError:
+                pass
+        duplicates = 0
+        for same_size in by_size.values():
+            if len(same_size) > 1:
+                digests = [ImageImporter._digest(path) for path in same_size]
+                duplicates += len(digests) - len(set(digests))
+        return duplicates
+
+    def compact_pdf(self, pdf_file):
+        # When uploaded images repeat, store identical PDF objects once. This
+        # only helps if create_pdf.py embeds each card as its own image. Not
+        # for plugin decks: nearly all repeat their basic lands, and rewriting
+        # every one of those PDFs through pypdf costs more than it saves.
+        if not DEDUPE_IMPORTS or self.input_method != "upload":
+            return
+        images = self.get_all_image_files_in_directory(self.front_dir) + \
+            self.get_all_image_files_in_directory(self.double_sided_dir)
+        if not self.count_duplicate_images(images):
+            return
+        output = []
+        code = self.run_process([self.venv_python, "-c", COMPACT_PDF_SCRIPT, pdf_file], "compact PDF",
+                                on_events=lambda events: output.extend(
+                                    e.data for e in events if e.kind == "line" and e.stream == "stdout"))
+        if code == 3:
+            self.log_message("Note: pypdf >= 4 is not installed in the venv, duplicate images stay in the PDF")
+        elif code != 0 or not output:
+            self.log_message(f"Warning: Could not compact the PDF (exit code {code})")
+        else:
+            before, after = (int(n) for n in output[-1].split())
+            if after < before:
+                self.log_message(f"✓ Duplicate images stored once: PDF {before / 1024 ** 2:.1f} MB "
+                                 f"-> {after / 1024 ** 2:.1f} MB")
+
+    def run_create_pdf(self, options):
+        cmd = [self.venv_python, "create_pdf.py"] + options
+        if self.use_pdf_worker:
+            self.log_message(f"Command (warm worker): {' '.join(cmd)}")
+            if self.pdf_worker is None or self.pdf_worker.python != self.venv_python:
+                self.close_pdf_worker()
+                self.pdf_worker = PdfWorker(self.venv_python, self.project_path, tracer=self.tracer)
+            try:
+                start = time.perf_counter()
+                code = self.pdf_worker.run(options, self.log_process_events)
+                self.record_usage("create_pdf.py (worker)", time.perf_counter() - start,
+                                  self.pdf_worker.last_usage, code)
+                return code
+            except PdfWorkerError as e:
+                self.log_message(f"Warning: {e}, running create_pdf.py directly")
+                self.close_pdf_worker()
+        self.log_message(f"Command: {' '.join(cmd)}")
+        return self.run_process(cmd, "create_pdf.py", on_events=self.log_process_events)
+
+    def preflight_images(self, options):
+        # Shrinks oversized images to the PDF's PPI and card size and converts
+        # exotic formats, in a process pool. Results are cached by content
+        # hash, so building the same upload again costs one hash per image.
+        if Image is None:
+            self.log_message("Pre-flight skipped: Pillow is not installed")
+            return
+        self.on_status("Pre-flight: normalizing images...")
+        try:
+            ppi = int((option_values(options, "--ppi") or ["300"])[-1])
+        except ValueError:
+            ppi = 300
+        card_size = (option_values(options, "--card_size") or [PDF_DEFAULT_CARD_SIZE])[-1]
+        box = preflight_box(ppi, card_size, (option_values(options, "--crop") or [None])[-1])
+        files = self.get_all_image_files_in_directory(self.front_dir) + \
+            self.get_all_image_files_in_directory(self.double_sided_dir)
+        if not files:
+            return
+
+        counts = {"ok": 0, "cached": 0, "resized": 0, "converted": 0, "failed": 0}
+        before = after = 0
+        self.begin_task(6, "Pre-flight", "images", len(files))
+        try:
+            with self.tracer.span("pre-flight images", "files", items=len(files), ppi=ppi), \
+                    process_pool(min(os.cpu_count() or 1, len(files))) as pool:
+                futures = {pool.submit(preflight_image, path, box, PREFLIGHT_CACHE_DIR): path
+                           for path in files}
+                for done, future in enumerate(as_completed(futures), 1):
+                    path = futures[future]
+                    try:
+                        _, result, status = future.result()
+                        if result:
+                            dest = os.path.splitext(path)[0] + os.path.splitext(result)[1]
+                            if dest != path and os.path.exists(dest):
+                                raise Exception(f"{os.path.basename(dest)} already exists")
+                            before += os.path.getsize(path)
+                            after += os.path.getsize(result)
+                            # Replace rather than overwrite: the file may be a hardlink
+                            tmp = dest + ".preflight.tmp"
+                            try:
+                                os.link(result, tmp)
+                            except OSError:
+                                shutil.copy2(result, tmp)
+                            os.replace(tmp, dest)
+                            if dest != path:
+                                os.remove(path)
+                        counts[status] += 1
+                    except Exception as e:
+                        counts["failed"] += 1
+                        self.log_message(f"Warning: Pre-flight failed for {os.path.basename(path)}: {e}")
+                    self.report_task(done)
+        finally:
+            self.end_task()
+        trim_preflight_cache(PREFLIGHT_CACHE_DIR)
+        self.image_index.invalidate()
+
+        summary = (f"{counts['resized']} resized, {counts['converted']} converted, "
+                   f"{counts['cached']} from cache, {counts['ok']} already fine")
+        if counts["failed"]:
+            summary += f", {counts['failed']} failed"
+        if before:
+            summary += f" ({before / 1024 ** 2:.1f} MB -> {after / 1024 ** 2:.1f} MB)"
+        self.log_message(f"✓ Pre-flight at {ppi} PPI: {summary}")
+
+    def create_pdf_sharded(self, options, max_shards):
+        # Splits game/front into runs of whole sheets, builds each in its own
+        # workspace and process, and merges the pages. Returns the merged PDF,
+        # or None when the deck should be built in a single process instead.
+        if any(opt.split("=")[0] in PDF_SHARD_UNSUPPORTED_OPTIONS for opt in options):
+            self.log_message("Custom folder/output options given, building the PDF in one process")
+            return None
+        paper_size = (option_values(options, "--paper_size") or [PDF_DEFAULT_PAPER_SIZE])[-1]
+        card_size = (option_values(options, "--card_size") or [PDF_DEFAULT_CARD_SIZE])[-1]
+        slots = sheet_capacity(self.project_path, paper_size, card_size)
+        if not slots:
+            self.log_message(f"Sheet layout for {paper_size}/{card_size} not found, "
+                             "building the PDF in one process")
+            return None
+        skipped = {int(v) for v in option_values(options, "--skip") if v.isdigit() and int(v) < slots}
+        per_sheet = slots - len(skipped)
+        fronts = sorted(self.get_all_image_files_in_directory(self.front_dir), key=os.path.basename)
+        if per_sheet <= 0 or not fronts:
+            return None
+        sheets = math.ceil(len(fronts) / per_sheet)
+        sheets_per_shard = math.ceil(sheets / min(max_shards, sheets))
+        chunk = sheets_per_shard * per_sheet
+        shard_files = [fronts[i:i + chunk] for i in range(0, len(fronts), chunk)]
+        if len(shard_files) < 2:
+            return None
+        if not self.pdf_merge_available():
+            self.log_message("pypdf is not installed in the virtual environment, "
+                             "building the PDF in one process")
+            return None
+
+        # Backs from double_sided travel with their fronts (paired by file name)
+        backs = {os.path.basename(p): p for p in self.get_all_image_files_in_directory(self.double_sided_dir)}
+        root = os.path.join(self.project_path, JOB_WORKSPACES_DIRNAME, "pdf-shards")
+        shutil.rmtree(root, ignore_errors=True)
+        self.log_message(f"Splitting {len(fronts)} cards ({sheets} sheets of {per_sheet}) "
+                         f"into {len(shard_files)} parallel PDF builds")
+        try:
+            workspaces = []
+            with self.tracer.span("shard workspaces", "files", items=len(fronts)):
+                for i, files in enumerate(shard_files):
+                    workspace = os.path.join(root, f"{i + 1:02d}")
+                    create_job_workspace(self.project_path, workspace)
+                    for path in files:
+                        name = os.path.basename(path)
+                        link_or_copy(path, os.path.join(workspace, "game", "front", name))
+                        if name in backs:
+                            link_or_copy(backs[name], os.path.join(workspace, "game", "double_sided", name))
+                    workspaces.append(workspace)
+
+            # Overall progress in cards: each shard's own N/M output, scaled to its size
+            self.begin_task(6, "Creating PDF", "cards", len(fronts))
+            shard_done = [0.0] * len(workspaces)
+
+            def run_shard(i):
+                prefix = f"[shard {i + 1}/{len(workspaces)}] "
+
+                def on_events(events):
+                    for event in events:
+                        if event.kind == "progress":
+                            shard_done[i] = len(shard_files[i]) * event.data[0] / event.data[1]
+                        elif event.kind == "exit":
+                            shard_done[i] = len(shard_files[i])
+                    self.report_task(int(sum(shard_done)))
+                    self.log_process_events([e._replace(data=prefix + e.data) for e in events
+                                             if e.kind == "line"])
+
+                start = time.monotonic()
+                code = self.run_process([self.venv_python, "create_pdf.py"] + options,
+                                        f"create_pdf.py shard {i + 1}", on_events=on_events, cwd=workspaces[i])
+                pdfs = glob.glob(os.path.join(workspaces[i], "game", "output", "*.pdf"))
+                return code, time.monotonic() - start, max(pdfs, key=os.path.getmtime) if pdfs else None
+
+            wall_start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=len(workspaces)) as pool:
+                results = list(pool.map(run_shard, range(len(workspaces))))
+            for i, (code, _, pdf) in enumerate(results):
+                if code != 0:
+                    raise Exception(f"PDF shard {i + 1} failed with exit code: {code}")
+                if not pdf:
+                    raise Exception(f"PDF shard {i + 1} did not produce a PDF")
+
+            os.makedirs(self.output_dir, exist_ok=True)
+            merged = os.path.join(self.output_dir, os.path.basename(results[0][2]))
+            tmp = merged + ".part"
+            code = self.run_process([self.venv_python, "-c", MERGE_PDFS_SCRIPT, tmp] + [r[2] for r in results],
+                                    "merge PDF shards", on_events=self.log_process_events)
+            if code != 0:
+                raise Exception(f"Merging the PDF shards failed with exit code: {code}")
+            os.replace(tmp, merged)
+            wall = time.monotonic() - wall_start
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+        # The shards ran side by side and competed for the CPU, so their wall
+        # times add up to more than one process would need: an upper bound
+        sequential = sum(r[1] for r in results)
+        self.log_message("PDF shards:")
+        first = 1
+        for i, (files, (_, seconds, _)) in enumerate(zip(shard_files, results)):
+            self.log_message(f"  shard {i + 1}: cards {first}-{first + len(files) - 1}, "
+                             f"{seconds:.1f}s ({len(files) / max(seconds, 0.001):.1f} cards/s)")
+            first += len(files)
+        self.log_message(f"  took {wall:.1f}s with merge; the shards' own times add up to {sequential:.1f}s, "
+                         f"so at most {sequential / max(wall, 0.001):.1f}x faster than one process "
+                         f"(estimate, not measured)")
+        self.log_message(f"Merged PDF: {merged}")
+        return merged
+
+    def pdf_merge_available(self):
+        # Whether the venv can merge sharded PDFs (pypdf or PyPDF2); None
+        # before step 3 has found the venv. Checked once per venv and install.
+        if not self.venv_python:
+            return None
+        if self.venv_python not in self._pdf_merge_checked:
+            code = StreamingProcess([self.venv_python, "-c", MERGE_PDFS_SCRIPT, "--check"],
+                                    tracer=self.tracer, name="check pypdf").run()
+            self._pdf_merge_checked[self.venv_python] = code == 0
+        return self._pdf_merge_checked[self.venv_python]
+
+    def close_pdf_worker(self):
+        if self.pdf_worker is not None:
+            self.pdf_worker.close()
+            self.pdf_worker = None
+
+    def resolve_project_path(self, path):
+        return path if os.path.isabs(path) else os.path.join(self.project_path, path)
+
+    def pdf_search_dirs(self, options):
+        # Folders a PDF may land in: game/output, game, the project folder and
+        # an --output_path folder. They are listed, never walked.
+        dirs = [self.output_dir, os.path.join(self.project_path, "game"), self.project_path]
+        for value in option_values(options, "--output_path"):
+            path = self.resolve_project_path(value)
+            dirs.append(path if os.path.isdir(path) else os.path.dirname(path))
+        return dirs
+
+    def locate_created_pdf(self, options, search_dirs, before, output_lines):
+        # The PDF create_pdf.py just wrote: its --output_path, else a .pdf path
+        # it printed, else the PDF that is new or changed in search_dirs
+        after = snapshot_pdfs(search_dirs)
+        candidates = list(option_values(options, "--output_path"))
+        for line in reversed(output_lines):
+            candidates.extend(re.findall(r"[^\s'\"]+\.pdf\b", line, re.IGNORECASE))
+        for candidate in candidates:
+            path = os.path.normpath(self.resolve_project_path(candidate))
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if os.path.isfile(path) and before.get(path) != (st.st_size, st.st_mtime_ns):
+                return path
+        changed = [path for path, signature in after.items() if before.get(path) != signature]
+        if changed:
+            return max(changed, key=lambda path: after[path][1])
+        return None
+
+    def pdf_manifest_path(self):
+        return os.path.join(self.project_path, ".gui_cache", PDF_MANIFEST_FILE)
+
+    def past_pdfs(self):
+        # Newest first; entries whose file has since been deleted are left out
+        try:
+            with open(self.pdf_manifest_path(), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return [entry for entry in entries if os.path.isfile(entry.get("path", ""))]
+
+    def record_pdf(self, pdf_file, options):
+        entry = {"path": os.path.abspath(pdf_file), "created": time.time(),
+                 "size": os.path.getsize(pdf_file), "options": list(options or [])}
+        with self._manifest_lock:
+            entries = [e for e in self.past_pdfs() if e["path"] != entry["path"]]
+            entries.insert(0, entry)
+            path = self.pdf_manifest_path()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(entries[:PDF_MANIFEST_MAX_ENTRIES], f, indent=1)
+                os.replace(tmp, path)
+            except OSError as e:
+                self.log_message(f"Warning: Could not update the PDF list: {e}")
+
+    # -------------- Whole run --------------
+    def prepare(self):
+        # Steps 1-4: everything before the input method is chosen; step 5
+        # then runs until use_decklist/use_uploaded_images
+        self.execute_step_1()
+        self.prepare_environment()
+        self.execute_step_4()
+        self.start_input_step()
+
+    def prepare_environment(self):
+        # Steps 2-3, one engine at a time
+        with ENVIRONMENT_LOCK:
+            self.execute_step_2()
+            self.execute_step_3()
+
+
+# -----------------------------
+# Multi-deck job queue
+# -----------------------------
+class Job:
+    STATES = ("queued", "downloading", "waiting for PDF", "building PDF", "done", "failed")
+
+    def __init__(self, job_id, name, game_dir, source, decklist_content, pdf_options, pdf_settings=None):
+        self.job_id = job_id
+        self.name = name
+        self.game_dir = game_dir
+        self.source = source
+        self.decklist_content = decklist_content
+        self.pdf_options = pdf_options    # None skips the PDF
+        self.pdf_settings = pdf_settings or {}  # engine settings: pdf_shards, preflight
+        self.state = "queued"
+        self.error = None
+        self.pdf_file = None
+        self.workspace = None
+
+
+class JobQueue:
+    # Runs each deck in its own workspace (see create_job_workspace). Downloads
+    # and PDF builds have separate concurrency limits, and one failed job does
+    # not stop the others. The venv and requirements are set up once, before
+    # the first job needs them, on an engine of the queue's own so the main
+    # window's steps are left alone.
+    def __init__(self, engine, download_limit=2, pdf_limit=1, on_change=None):
+        self.engine = engine              # configured engine for the real project
+        self.download_slots = threading.Semaphore(download_limit)
+        self.pdf_slots = threading.Semaphore(pdf_limit)
+        self.on_change = on_change or (lambda job: None)
+        self.jobs = []
+        self._lock = threading.Lock()
+        self._prepare_lock = threading.Lock()
+        self._prepared = False
+        self._prepare_error = None
+        self.venv_python = None
+
+    def add(self, name, game_dir, source, decklist_content, pdf_options, pdf_settings=None):
+        with self._lock:
+            job = Job(len(self.jobs) + 1, name, game_dir, source, decklist_content, pdf_options,
+                      pdf_settings)
+            self.jobs.append(job)
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        return job
+
+    def _set_state(self, job, state, error=None):
+        job.state = state
+        job.error = error
+        self.on_change(job)
+
+    def _ensure_prepared(self):
+        with self._prepare_lock:
+            if not self._prepared:
+                log = self.engine.log_message
+                setup = WorkflowEngine(log=lambda message: log(f"[queue setup] {message}"),
+                                       image_store=self.engine.image_store)
+                setup.set_project_directory(self.engine.project_path)
+                try:
+                    setup.prepare_environment()
+                    self.venv_python = setup.venv_python
+                except Exception as e:
+                    self._prepare_error = e
+                finally:
+                    setup.finish_run()
+                self._prepared = True
+        if self._prepare_error is not None:
+            raise Exception(f"Environment setup failed: {self._prepare_error}")
+
+    def _reserve_pdf_path(self, safe_name):
+        # "<deck>-<date>-<time>.pdf" in the project's output folder, with a
+        # counter if that exists (same deck name this second, or an earlier
+        # session). The empty file claims the name until the copy lands.
+        os.makedirs(self.engine.output_dir, exist_ok=True)
+        base = os.path.join(self.engine.output_dir, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        path, counter = base + ".pdf", 1
+        with self._lock:
+            while True:
+                try:
+                    with open(path, "x"):
+                        return path
+                except FileExistsError:
+                    counter += 1
+                    path = f"{base}-{counter}.pdf"
+
+    def _run(self, job):
+        log = self.engine.log_message
+        engine = WorkflowEngine(log=lambda message: log(f"[{job.name}] {message}"),
+                                image_store=self.engine.image_store)
+        error = None
+        try:
+            self._ensure_prepared()
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", job.name)
+            job.workspace = os.path.join(self.engine.project_path, JOB_WORKSPACES_DIRNAME,
+                                         f"{job.job_id:03d}-{safe_name}")
+            if os.path.exists(job.workspace):
+                shutil.rmtree(job.workspace)
+            create_job_workspace(self.engine.project_path, job.workspace)
+            engine.set_project_directory(job.workspace)
+            engine.venv_python = self.venv_python
+            engine.use_pdf_worker = False  # the workspace is gone after one PDF
+            engine.pdf_shards = job.pdf_settings.get("pdf_shards", 1)
+            engine.preflight = job.pdf_settings.get("preflight", False)
+
+            with self.download_slots:
+                self._set_state(job, "downloading")
+                engine.use_decklist(job.decklist_content, job.game_dir, job.source)
+                engine.execute_step_6()
+
+            if job.pdf_options is not None:
+                self._set_state(job, "waiting for PDF")
+                with self.pdf_slots:
+                    self._set_state(job, "building PDF")
+                    pdf_file = engine.create_pdf(job.pdf_options)
+                if pdf_file:
+                    job.pdf_file = self._reserve_pdf_path(safe_name)
+                    shutil.copy2(pdf_file, job.pdf_file)
+                    self.engine.record_pdf(job.pdf_file, job.pdf_options)
+                    log(f"[{job.name}] ✓ PDF saved to {job.pdf_file}")
+        except Exception as e:
+            log(f"[{job.name}] Job failed: {e}")
+            error = str(e)
+        finally:
+            # Failed or not, hand the images to the store for the next deck,
+            # then drop the workspace
+            if job.workspace and engine.project_path == job.workspace:
+                try:
+                    engine.execute_step_4()
+                except Exception as e:
+                    log(f"[{job.name}] Warning: Could not store the job's images: {e}")
+            if job.workspace:
+                shutil.rmtree(job.workspace, ignore_errors=True)
+            engine.finish_run()
+        if error is None:
+            self._set_state(job, "done")
+        else:
+            self._set_state(job, "failed", error)
+
@@ -0,0 +1,157 @@
+import argparse
+import os
+import re
+import shlex
+import sys
+import time
+
+from card_maker_core import GAMES, PROJECT_FOLDER_NAME, LogPipeline, WorkflowEngine, describe_progress
+
+PAPER_SIZES = ["letter", "a4", "a3", "tabloid", "archb"]
+CARD_SIZES = ["standard", "standard_double", "japanese", "poker", "poker_half",
+              "bridge", "bridge_square", "domino", "domino_square", "tarot"]
+
+
+def resolve_plugin(game_name, method_name):
+    # Accepts the GUI labels ("Magic: The Gathering", "Moxfield") or the plugin names ("mtg", "moxfield")
+    for label, game in GAMES.items():
+        if game_name.lower() in (label.lower(), game["dir"]):
+            for method_label, source in game["methods"].items():
+                if method_name.lower() in (method_label.lower(), source):
+                    return game["dir"], source
+            raise ValueError(f"Unknown import method '{method_name}' for {label}. "
+                             f"Choose from: {', '.join(game['methods'].values())}")
+    raise ValueError(f"Unknown game '{game_name}'. Choose from: {', '.join(g['dir'] for g in GAMES.values())}")
+
+
+def build_pdf_options(args):
+    # Same flags the PDF options dialog produces
+    opts = []
+    if args.only_fronts:
+        opts.append("--only_fronts")
+    if args.ppi is not None:
+        opts.extend(["--ppi", str(args.ppi)])
+    if args.high_quality:
+        opts.extend(["--quality", "100"])
+    if args.extend_corners is not None:
+        opts.extend(["--extend_corners", str(args.extend_corners)])
+    if args.paper_size:
+        opts.extend(["--paper_size", args.paper_size])
+    if args.crop:
+        match = re.fullmatch(r"([0-9.]+)\s*(%|mm|in)?", args.crop.strip())
+        if not match:
+            raise ValueError("Crop must be a number optionally followed by '%', 'mm' or 'in'")
+        value = float(match.group(1))
+        if not (0 <= value <= 100):
+            raise ValueError("Crop value must be between 0 and 100")
+        unit = match.group(2)
+        opts.extend(["--crop", f"{value}{unit}" if unit in ("mm", "in") else str(value)])
+    if args.load_offset:
+        opts.append("--load_offset")
+    if args.card_size:
+        opts.extend(["--card_size", args.card_size])
+    for idx in args.skip or []:
+        opts.extend(["--skip", str(idx)])
+    if args.pdf_args:
+        opts.extend(shlex.split(args.pdf_args))
+    return opts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the Silhouette Card Maker workflow end to end without a display.")
+    parser.add_argument("--project", help=f"Path to the {PROJECT_FOLDER_NAME} folder (default: find it)")
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--decklist", help="Decklist file to download with a plugin")
+    source.add_argument("--images", help="Folder of front card images to use instead of a plugin")
+    parser.add_argument("--game", help="Game for --decklist, e.g. mtg or 'Magic: The Gathering'")
+    parser.add_argument("--source", help="Import method for --decklist, e.g. moxfield")
+    parser.add_argument("--double-sided", help="Folder of double-faced card images (with --images)")
+
+    pdf = parser.add_argument_group("PDF options")
+    pdf.add_argument("--no-pdf", action="store_true", help="Stop after the images are ready")
+    pdf.add_argument("--only-fronts", action="store_true")
+    pdf.add_argument("--ppi", type=int)
+    pdf.add_argument("--high-quality", action="store_true", help="--quality 100")
+    pdf.add_argument("--extend-corners", type=int)
+    pdf.add_argument("--paper-size", choices=PAPER_SIZES)
+    pdf.add_argument("--crop", help="0-100, optionally with a unit: 6.5, 3mm, 0.1in")
+    pdf.add_argument("--load-offset", action="store_true")
+    pdf.add_argument("--card-size", choices=CARD_SIZES)
+    pdf.add_argument("--skip", type=int, action="append", help="Card index to skip (repeatable)")
+    pdf.add_argument("--pdf-args", help="Extra options passed to create_pdf.py as-is")
+    pdf.add_argument("--preflight", action="store_true",
+                     help="Shrink --images to the PPI and convert exotic formats first (cached)")
+    pdf.add_argument("--parallel", type=int, nargs="?", const=os.cpu_count() or 1, default=1,
+                     metavar="N", help="Split the PDF across N processes (default: all CPU cores)")
+
+    args = parser.parse_args(argv)
+    if args.decklist and not (args.game and args.source):
+        parser.error("--decklist requires --game and --source")
+    if args.skip and any(idx < 0 for idx in args.skip):
+        parser.error("--skip indices must be >= 0")
+    if args.parallel < 1:
+        parser.error("--parallel must be >= 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log = LogPipeline(echo=sys.stdout)
+    last_report = {"time": 0.0, "text": None}
+
+    def report_progress(progress):
+        # At most one progress line every 5 seconds, plus the final count
+        now = time.monotonic()
+        text = describe_progress(progress)
+        if text != last_report["text"] and (now - last_report["time"] >= 5 or progress.fraction == 1):
+            last_report.update(time=now, text=text)
+            log.write(f"{progress.label}: {text}")
+
+    engine = WorkflowEngine(log=log.write,
+                            on_step=lambda index, status: log.write(f"Step {index + 1}: {status}"),
+                            on_task_progress=report_progress)
+    engine.pdf_shards = args.parallel
+    engine.preflight = args.preflight
+    # Relative to where the command was run, whatever the engine does later
+    for name in ("project", "decklist", "images", "double_sided"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+    try:
+        pdf_options = build_pdf_options(args)
+        if args.decklist:
+            plug_dir, plug_src = resolve_plugin(args.game, args.source)
+
+        project = args.project or engine.cached_project_directory() or engine.find_project_directory()
+        if not project or not engine.validate_project_directory(project):
+            raise Exception(f"Could not find a valid {PROJECT_FOLDER_NAME} folder")
+        engine.set_project_directory(project)
+
+        engine.prepare()
+
+        if args.decklist:
+            with open(args.decklist, "r", encoding="utf-8") as f:
+                engine.use_decklist(f.read().strip(), plug_dir, plug_src)
+        else:
+            # Folders are imported recursively
+            double = [args.double_sided] if args.double_sided else []
+            engine.use_uploaded_images(engine.import_images([args.images], double))
+
+        engine.execute_step_6()
+
+        if args.no_pdf:
+            log.write("PDF creation skipped")
+            return 0
+        pdf_file = engine.create_pdf(pdf_options)
+        log.write(f"PDF: {pdf_file}" if pdf_file else "PDF created, but the file could not be located")
+        return 0
+    except Exception as e:
+        log.write(f"Workflow failed: {e}")
+        return 1
+    finally:
+        engine.finish_run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
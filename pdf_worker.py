@@ -0,0 +1,147 @@
+# Long-lived create_pdf.py runner. card_maker_core.PdfWorker starts it with the
+# project venv's Python; it imports create_pdf.py once and then runs one job
+# per JSON line on stdin ({"args": [...]}), so Pillow, fonts and the rest of
+# the PDF machinery are only loaded for the first PDF.
+#
+# Replies are JSON lines on stdout:
+#   {"ready": true}                               create_pdf.py is loaded
+#   {"stream": "stdout" | "stderr", "line": ...}  output of the running job
+#   {"exit": <code>}                              the job has finished
+#
+# Keep this file Python 3.8 compatible, it runs in the project venv.
+import gc
+import importlib.util
+import io
+import json
+import os
+import re
+import runpy
+import sys
+import traceback
+
+SCRIPT = "create_pdf.py"
+
+# fd 1 carries the protocol only; anything written straight to the file
+# descriptor (C extensions, child processes) ends up on stderr instead
+protocol = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+os.dup2(2, 1)
+requests = sys.stdin
+
+
+def send(message):
+    protocol.write(json.dumps(message) + "\n")
+    protocol.flush()
+
+
+class LineForwarder(io.TextIOBase):
+    # sys.stdout/sys.stderr replacement that sends whole lines (\r counts as a
+    # line end, so progress bars come through as they update)
+    encoding = "utf-8"
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.partial = ""
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    def write(self, text):
+        *lines, self.partial = re.split(r"\r\n|\r|\n", self.partial + text)
+        for line in lines:
+            send({"stream": self.stream, "line": line})
+        return len(text)
+
+    def finish(self):
+        if self.partial:
+            send({"stream": self.stream, "line": self.partial})
+            self.partial = ""
+
+
+def load_command():
+    # Import create_pdf.py as a module (its __main__ block does not run) and
+    # return its click command, or None to fall back to runpy for every job.
+    # A script without a __main__ guard would do its work on import, so it is
+    # only ever run through runpy (its imports still stay loaded between jobs).
+    with open(SCRIPT, "r", encoding="utf-8") as f:
+        if not re.search(r"^if\s+__name__\s*==", f.read(), re.MULTILINE):
+            return None
+    sys.argv = [SCRIPT]
+    spec = importlib.util.spec_from_file_location("create_pdf", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["create_pdf"] = module
+    spec.loader.exec_module(module)
+    for value in vars(module).values():
+        callback = getattr(value, "callback", None)
+        if hasattr(value, "params") and callable(getattr(value, "main", None)) \
+                and getattr(callback, "__module__", None) == "create_pdf":
+            return value
+    return None
+
+
+def run_job(command, args):
+    sys.argv = [SCRIPT] + list(args)
+    try:
+        if command is None:
+            runpy.run_path(SCRIPT, run_name="__main__")
+            return 0
+        result = command.main(args=list(args), prog_name=SCRIPT, standalone_mode=False)
+        return result if isinstance(result, int) else 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception as e:
+        # click usage errors know how to print themselves
+        if callable(getattr(e, "show", None)) and isinstance(getattr(e, "exit_code", None), int):
+            e.show()
+            return e.exit_code
+        traceback.print_exc()
+        return 1
+
+
+def main():
+    os.chdir(sys.argv[1])
+    sys.path.insert(0, os.getcwd())
+    stdout, stderr = LineForwarder("stdout"), LineForwarder("stderr")
+    sys.stdout, sys.stderr = stdout, stderr
+    sys.stdin = io.StringIO("")
+
+    def load():
+        # If the import fails, jobs fall back to runpy, which shows the real error
+        try:
+            mtime = os.path.getmtime(SCRIPT)
+        except OSError:
+            return None, None
+        try:
+            return load_command(), mtime
+        except Exception:
+            return None, mtime
+
+    command, loaded_mtime = load()
+    stdout.finish()
+    stderr.finish()
+    send({"ready": True})
+
+    for line in requests:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        try:
+            # Pick up an edited create_pdf.py without restarting the worker
+            if os.path.getmtime(SCRIPT) != loaded_mtime:
+                command, loaded_mtime = load()
+        except OSError:
+            pass
+        code = run_job(command, job.get("args", []))
+        stdout.finish()
+        stderr.finish()
+        send({"exit": code})
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()